@@ -1,19 +1,43 @@
-import io
+import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 from statistics import NormalDist
+from typing import Optional
 
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
-from src.analysis import analyze_dataframe, build_figure, validate_dataframe
+from src.analysis import REQUIRED_COLUMNS, TableSummary, read_table_bytes, sample_preview, summarize_table
+from src.jobs import AnalysisJobRunner
+from src.memory import SessionMemoryManager
+from src.pipeline import analysis_cache_key, dataset_fingerprint, run_analysis_pipeline
+from src.simulation import SimulationSpec
+from src.store import FIGURE_MAX_POINTS, ResultStore, default_store_path
 
 
 st.set_page_config(page_title="Flux規格提案くん", layout="wide")
 
+# Uploads above this many rows are previewed as a bounded sample plus summary statistics
+# so the full table is never serialized to the browser.
+LARGE_UPLOAD_ROWS = 5000
+PREVIEW_MAX_ROWS = 200
+ANALYSIS_WORKERS = 4
+JOB_POLL_INTERVAL_SEC = 0.25
+# Caps for parsed previews and analysis results held on the shared server; overflow spills to disk.
+SESSION_MEMORY_CAP_MB = float(os.environ.get("FLUX_SESSION_MEMORY_MB", "256"))
+GLOBAL_MEMORY_CAP_MB = float(os.environ.get("FLUX_GLOBAL_MEMORY_MB", "1024"))
+SPILL_DIR = os.environ.get("FLUX_SPILL_DIR") or None
+# Sessions idle longer than this are reaped even if the runtime still lists them.
+SESSION_TTL_MIN = float(os.environ.get("FLUX_SESSION_TTL_MIN", "120"))
+SIMULATION_SPEC = SimulationSpec()
+
 
 def get_resource_path(filename: str) -> Path:
     """
@@ -47,7 +71,92 @@ def build_template_csv_bytes() -> bytes:
 def read_uploaded_csv(file_obj) -> pd.DataFrame:
     raw = file_obj.getvalue()
     # UTF-8 is the standard; utf-8-sig also accepts BOM-prefixed UTF-8 safely.
-    return pd.read_csv(io.BytesIO(raw), encoding="utf-8-sig")
+    # Parquet/Feather uploads are detected by extension and skip text parsing.
+    return read_table_bytes(raw, getattr(file_obj, "name", "upload.csv"), encoding="utf-8-sig")
+
+
+@st.cache_resource
+def get_analysis_executor() -> ThreadPoolExecutor:
+    # One pool for the whole server; each session keeps its own job table on top of it.
+    return ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+
+
+@st.cache_resource
+def get_memory_manager() -> SessionMemoryManager:
+    return SessionMemoryManager(
+        session_cap_bytes=int(SESSION_MEMORY_CAP_MB * 1024 * 1024),
+        global_cap_bytes=int(GLOBAL_MEMORY_CAP_MB * 1024 * 1024),
+        spill_dir=SPILL_DIR,
+    )
+
+
+@st.cache_resource
+def get_result_store() -> ResultStore:
+    return ResultStore(default_store_path())
+
+
+def reap_closed_sessions(memory: SessionMemoryManager, current_session_id: str) -> None:
+    # Streamlit has no session-end hook, so drop artifacts of sessions the runtime no longer knows.
+    def is_alive(sid: str) -> bool:
+        return sid == current_session_id or not Runtime.exists() or Runtime.instance().is_active_session(sid)
+
+    memory.reap_sessions(is_alive=is_alive, max_idle_seconds=SESSION_TTL_MIN * 60)
+
+
+def get_session_id() -> str:
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
+
+
+def load_preview_df(file_obj) -> tuple[int, pd.DataFrame, Optional[TableSummary]]:
+    """Row count, displayed rows and (large uploads only) summary of an upload.
+
+    Parsed and summarized once per upload. Only what the page shows is kept in the
+    memory manager, never the full frame; the pipeline re-parses the raw bytes.
+    """
+    memory = get_memory_manager()
+    fingerprint = get_upload_fingerprint(file_obj)
+    cached = memory.get(get_session_id(), "preview")
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1], cached[2], cached[3]
+    full_df = read_uploaded_csv(file_obj)
+    row_count = len(full_df)
+    upload_summary = None
+    preview_df = full_df
+    if row_count > LARGE_UPLOAD_ROWS:
+        if set(REQUIRED_COLUMNS).issubset(full_df.columns):
+            upload_summary = summarize_table(full_df)
+        preview_df = sample_preview(full_df, max_rows=PREVIEW_MAX_ROWS)
+    memory.put(get_session_id(), "preview", (fingerprint, row_count, preview_df, upload_summary))
+    return row_count, preview_df, upload_summary
+
+
+def get_job_runner() -> AnalysisJobRunner:
+    if "job_runner" not in st.session_state:
+        st.session_state["job_runner"] = AnalysisJobRunner(get_analysis_executor())
+    return st.session_state["job_runner"]
+
+
+def get_upload_fingerprint(file_obj) -> str:
+    # Hash each upload once per session instead of on every polling rerun.
+    fingerprints = st.session_state.setdefault("upload_fingerprints", {})
+    file_id = getattr(file_obj, "file_id", None) or f"{file_obj.name}:{file_obj.size}"
+    if file_id not in fingerprints:
+        fingerprints[file_id] = dataset_fingerprint(file_obj.getvalue())
+    return fingerprints[file_id]
+
+
+def build_job_key(
+    file_obj,
+    min_ele_flow: float,
+    max_ele_flow: float,
+    prediction_interval_pct: float,
+    show_conformance: bool,
+) -> str:
+    return (
+        f"{get_upload_fingerprint(file_obj)}:{min_ele_flow!r}:{max_ele_flow!r}:"
+        f"{prediction_interval_pct!r}:{show_conformance}"
+    )
 
 
 def update_progress(progress_bar, status_box, value: int, message: str) -> None:
@@ -76,25 +185,22 @@ def build_prediction_interval_simulation_figure(confidence_pct: float) -> tuple[
     # Simulation constants for an intuitive manufacturing example.
     lsl = 9200.0
     usl = 12600.0
-    slope = 4700.0
-    intercept = 5000.0
-    x_min, x_max = 0.8, 1.8
-    x_plot_min, x_plot_max = 0.8, 1.8
-    x_center = (x_min + x_max) / 2.0
-    base_sigma = 240.0
-    sigma_variation = 45.0
-
-    # Load pre-generated perfect simulation data (seed 634, quantile method)
-    # This data achieves ±1 accuracy for all prediction levels 50-99%
+    spec = SIMULATION_SPEC
+    x_min, x_max = spec.x_min, spec.x_max
+    x_plot_min, x_plot_max = spec.x_min, spec.x_max
+
+    # Load pre-generated simulation data (seed 634, quantile method).
+    # Counted against this chart's interpolated band it is within ±1 point at every level 50-99% (26/50 exact).
+    # Regenerate with tools/generate_simulation_data.py (see src/simulation.py).
     sim_data = pd.read_csv(get_resource_path("simulation_data_perfect.csv"))
     x_obs = sim_data["x"].to_numpy()
     y_obs = sim_data["y"].to_numpy()
 
-    x_line = np.linspace(x_plot_min, x_plot_max, 320)
-    y_line = slope * x_line + intercept
+    x_line = spec.x_grid()
+    y_line = spec.slope * x_line + spec.intercept
 
     z = NormalDist().inv_cdf(0.5 + float(confidence_pct) / 200.0)
-    pred_sigma = base_sigma + sigma_variation * ((x_line - x_center) ** 2)
+    pred_sigma = spec.pred_sigma(x_line)
     band_half = z * pred_sigma
     pi_upper = y_line + band_half
     pi_lower = y_line - band_half
@@ -281,17 +387,30 @@ st.download_button(
 draw_section_divider()
 
 st.subheader("📂 ステップ2")
-st.write("作成したCSVファイルをアップロードしてください。")
+st.write("作成したCSVファイルをアップロードしてください。大容量データは Parquet / Feather 形式も利用できます。")
 uploaded_file = st.file_uploader(
     "ドラッグ&ドロップ、またはクリックしてファイルを選択",
-    type=["csv"],
+    type=["csv", "parquet", "feather"],
     label_visibility="visible",
 )
 
+upload_rows = 0
 if uploaded_file is not None:
     try:
-        preview_df = read_uploaded_csv(uploaded_file)
+        upload_rows, preview_df, upload_summary = load_preview_df(uploaded_file)
         st.subheader("🗂️ アップロード済みデータ")
+        if upload_rows > LARGE_UPLOAD_ROWS:
+            st.info(
+                f"大容量モード: 全 {upload_rows:,} 行のうち "
+                f"先頭とランダム抽出の {PREVIEW_MAX_ROWS} 行のみを表示しています。"
+            )
+            if upload_summary is not None:
+                summary_col1, summary_col2 = st.columns(2)
+                summary_col1.metric("行数", f"{upload_summary.row_count:,}")
+                summary_col2.metric("不正な行数", f"{upload_summary.invalid_row_count:,}")
+                st.dataframe(upload_summary.stats, use_container_width=True)
+            else:
+                st.warning(f"必須列 {REQUIRED_COLUMNS} が見つからないため、集計は表示できません。")
         st.dataframe(preview_df, use_container_width=True, height=200)
     except Exception as exc:
         st.error(f"CSVの読み込みに失敗しました: {exc}")
@@ -326,6 +445,12 @@ with input_col5:
     st.write("")
     run_clicked = st.button("🚀 分析実行", type="primary", use_container_width=True)
 
+show_conformance = st.checkbox(
+    "適合確率カーブを表示（上下限を同時に満たす確率。目標確率 = 予測水準）",
+    value=False,
+)
+lot_name = st.text_input("ロット名（任意・解析履歴の検索に使用）", value="")
+
 if prediction_interval_option == "カスタム":
     prediction_interval_pct = float(custom_prediction_interval_pct)
 else:
@@ -350,76 +475,144 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+current_job_key = None
+if uploaded_file is not None and min_ele_flow < max_ele_flow:
+    current_job_key = build_job_key(
+        uploaded_file, min_ele_flow, max_ele_flow, prediction_interval_pct, show_conformance
+    )
+
+memory_manager = get_memory_manager()
+session_id = get_session_id()
+reap_closed_sessions(memory_manager, session_id)
+# Upload bytes are held by Streamlit, so they are reported here but not capped.
+memory_manager.record_upload(session_id, uploaded_file.size if uploaded_file is not None else 0)
+job_runner = get_job_runner()
+# Inputs changed (or the file was removed): drop any job computed for the old inputs.
+job_runner.cancel_stale(current_job_key)
+
+output = None
+cached_result = memory_manager.get(session_id, "analysis_result")
+if cached_result is not None and cached_result[0] == current_job_key:
+    output = cached_result[1]
+
 if run_clicked:
     if uploaded_file is None:
         st.error("先にCSVファイルをアップロードしてください。")
     elif min_ele_flow >= max_ele_flow:
         st.error("Min_Ele_Flow は Max_Ele_Flow より小さい値にしてください。")
+    elif output is None:
+        job_runner.submit(
+            current_job_key,
+            run_analysis_pipeline,
+            uploaded_file.getvalue(),
+            uploaded_file.name,
+            min_ele_flow=min_ele_flow,
+            max_ele_flow=max_ele_flow,
+            prediction_interval_pct=prediction_interval_pct,
+            conformance_target=prediction_interval_pct / 100.0 if show_conformance else None,
+            store=get_result_store(),
+            lot=lot_name.strip() or None,
+            # Large uploads: do not ship every observation to the browser.
+            figure_max_points=FIGURE_MAX_POINTS if upload_rows > LARGE_UPLOAD_ROWS else None,
+        )
     else:
+        # Result already on screen: nothing to recompute, but the click is still a run in the history.
+        get_result_store().record_run(
+            analysis_cache_key(
+                get_upload_fingerprint(uploaded_file),
+                min_ele_flow,
+                max_ele_flow,
+                prediction_interval_pct,
+                prediction_interval_pct / 100.0 if show_conformance else None,
+            ),
+            lot=lot_name.strip() or None,
+        )
+
+job_in_progress = False
+current_job = job_runner.get(current_job_key)
+if current_job is not None:
+    if not current_job.done():
+        # Polled from the end of the script so the rest of the page still renders.
+        job_in_progress = True
         progress_bar = st.progress(0)
         status_box = st.empty()
-        try:
-            update_progress(progress_bar, status_box, 0, "開始しました")
-            time.sleep(0.08)
-
-            update_progress(progress_bar, status_box, 20, "CSVを読み込み中")
-            df = read_uploaded_csv(uploaded_file)
-            time.sleep(0.08)
-
-            update_progress(progress_bar, status_box, 40, "データを検証中")
-            validated_df = validate_dataframe(df)
-            time.sleep(0.08)
-
-            update_progress(progress_bar, status_box, 65, "回帰分析を実行中")
-            result, pred_summary, fitted_values = analyze_dataframe(
-                validated_df,
-                min_ele_flow=min_ele_flow,
-                max_ele_flow=max_ele_flow,
-                prediction_interval_pct=prediction_interval_pct,
-            )
+        update_progress(progress_bar, status_box, current_job.progress, current_job.message)
+    elif current_job.failed():
+        st.error(f"分析に失敗しました: {current_job.error()}")
+    else:
+        # Hand the finished result to the memory manager so it is capped and spillable.
+        output = current_job.result()
+        memory_manager.put(session_id, "analysis_result", (current_job_key, output))
+        job_runner.pop(current_job_key)
+
+if output is not None:
+    result = output.result
+    st.success("分析が完了しました。")
+    if output.cached:
+        st.caption("同じデータ・条件の保存済み結果を表示しています（再計算なし）。")
+    total_points = output.in_count + output.out_count
+    if total_points > FIGURE_MAX_POINTS and (output.cached or total_points > LARGE_UPLOAD_ROWS):
+        st.caption(f"グラフの散布点は {FIGURE_MAX_POINTS:,} 点に間引いて表示しています（点数・比率は全データで集計）。")
+    st.subheader("✅ 分析結果")
+    result_col_left, result_col_right = st.columns([1, 2])
+    with result_col_left:
+        st.write(f"回帰式: y = {result.slope:.3f}x {result.intercept:+.3f}")
+        st.write(f"決定係数 R^2: {result.r_squared:.3f}")
+        st.write(f"予測水準: {output.prediction_interval_pct:g}%")
+        if result.has_range:
+            st.write(f"平膜Flux範囲: {result.min_intersection:.3f} ～ {result.max_intersection:.3f}")
+        else:
+            st.write("平膜Flux範囲: この条件では予測区間が上下限に届く範囲はありません")
+
+        # 点数表示を追加
+        st.write("")  # 空行
+        st.markdown(f'<span style="color: rgba(0, 90, 180, 0.8);">予測区間内 ●: {output.in_count} 点</span>', unsafe_allow_html=True)
+        st.markdown(f'<span style="color: rgba(198, 40, 40, 0.85);">予測区間外 ●: {output.out_count} 点</span>', unsafe_allow_html=True)
+        st.write(f"区間内の比率: {output.in_ratio_pct:.1f}%")
+
+        if output.conformance is not None:
+            conformance = output.conformance
+            st.write("")
+            st.write(f"適合確率が最大となる F.S.Flux: {conformance.best_x:.3f}（{conformance.best_probability:.1%}）")
+            if np.isfinite(conformance.target_min):
+                st.write(
+                    f"適合確率 {conformance.target_probability:.1%} 以上の範囲: "
+                    f"{conformance.target_min:.3f} ～ {conformance.target_max:.3f}"
+                )
+            else:
+                st.write(f"適合確率 {conformance.target_probability:.1%} 以上となる範囲はありません")
+    with result_col_right:
+        st.plotly_chart(output.figure, use_container_width=True)
 
-            # 点数計算（予測区間内/区間外）
-            obs_ci_upper = pred_summary["obs_ci_upper"].to_numpy()
-            obs_ci_lower = pred_summary["obs_ci_lower"].to_numpy()
-            y_values = validated_df["Ele.Flow"].to_numpy()
-            in_interval_mask = (y_values <= obs_ci_upper) & (y_values >= obs_ci_lower)
-
-            in_count = int(np.count_nonzero(in_interval_mask))
-            out_count = int(len(y_values) - in_count)
-            ratio = in_count / len(y_values) * 100.0
-
-            time.sleep(0.08)
-
-            update_progress(progress_bar, status_box, 85, "グラフを作成中")
-            fig = build_figure(
-                validated_df,
-                pred_summary,
-                fitted_values,
-                result,
-                min_ele_flow=min_ele_flow,
-                max_ele_flow=max_ele_flow,
-                prediction_interval_pct=prediction_interval_pct,
-            )
-            time.sleep(0.08)
-
-            update_progress(progress_bar, status_box, 100, "完了")
-            st.success("分析が完了しました。")
-            st.subheader("✅ 分析結果")
-            result_col_left, result_col_right = st.columns([1, 2])
-            with result_col_left:
-                st.write(f"回帰式: y = {result.slope:.3f}x {result.intercept:+.3f}")
-                st.write(f"決定係数 R^2: {result.r_squared:.3f}")
-                st.write(f"予測水準: {prediction_interval_pct:g}%")
-                st.write(f"平膜Flux範囲: {result.min_intersection:.3f} ～ {result.max_intersection:.3f}")
-
-                # 点数表示を追加
-                st.write("")  # 空行
-                st.markdown(f'<span style="color: rgba(0, 90, 180, 0.8);">予測区間内 ●: {in_count} 点</span>', unsafe_allow_html=True)
-                st.markdown(f'<span style="color: rgba(198, 40, 40, 0.85);">予測区間外 ●: {out_count} 点</span>', unsafe_allow_html=True)
-                st.write(f"区間内の比率: {ratio:.1f}%")
-            with result_col_right:
-                st.plotly_chart(fig, use_container_width=True)
-        except Exception as exc:
-            status_box.empty()
-            progress_bar.empty()
-            st.error(f"分析に失敗しました: {exc}")
+draw_section_divider()
+with st.expander("🧮 メモリ使用状況"):
+    usage_df = memory_manager.usage()
+    usage_col1, usage_col2, usage_col3 = st.columns(3)
+    usage_col1.metric("このセッション", f"{memory_manager.memory_bytes(session_id) / 1024 ** 2:.1f} MB")
+    usage_col2.metric("サーバー全体", f"{memory_manager.memory_bytes() / 1024 ** 2:.1f} MB")
+    usage_col3.metric("上限（セッション / 全体）", f"{SESSION_MEMORY_CAP_MB:g} / {GLOBAL_MEMORY_CAP_MB:g} MB")
+    usage_df["session"] = usage_df["session"].str[:8]
+    usage_df["memory_mb"] = usage_df.pop("memory_bytes") / 1024 ** 2
+    usage_df["spilled_mb"] = usage_df.pop("spilled_bytes") / 1024 ** 2
+    usage_df["upload_mb"] = usage_df.pop("upload_bytes") / 1024 ** 2
+    st.dataframe(usage_df, use_container_width=True, hide_index=True)
+
+with st.expander("📚 解析履歴"):
+    history_col1, history_col2, history_col3 = st.columns([1.5, 1, 1])
+    with history_col1:
+        history_lot = st.text_input("ロット名（前方一致）", value="", key="history_lot")
+    with history_col2:
+        history_since = st.date_input("開始日", value=None, key="history_since")
+    with history_col3:
+        history_until = st.date_input("終了日", value=None, key="history_until")
+    history_df = get_result_store().history(
+        lot=history_lot.strip() or None,
+        since=datetime.combine(history_since, datetime.min.time()) if history_since else None,
+        until=datetime.combine(history_until, datetime.max.time()) if history_until else None,
+    )
+    st.write(f"{len(history_df)} 件")
+    st.dataframe(history_df.drop(columns=["dataset_hash"]), use_container_width=True, hide_index=True)
+
+if job_in_progress:
+    time.sleep(JOB_POLL_INTERVAL_SEC)
+    st.rerun()
@@ -0,0 +1,69 @@
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from src.pipeline import run_analysis_pipeline
+from src.store import ResultStore, default_store_path
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Analyze a data file or query past analyses from the results store.")
+    parser.add_argument("--db", type=Path, default=None, help="Results database (default: FLUX_RESULTS_DB or ~/.flux_bound_designer)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    analyze = subparsers.add_parser("analyze", help="Analyze a CSV/Parquet/Feather file")
+    analyze.add_argument("path", type=Path)
+    analyze.add_argument("--min-ele-flow", type=float, required=True)
+    analyze.add_argument("--max-ele-flow", type=float, required=True)
+    analyze.add_argument("--prediction-interval-pct", type=float, default=95.0)
+    analyze.add_argument("--lot", default=None)
+    analyze.add_argument("--no-store", action="store_true", help="Neither read nor write the results store")
+
+    history = subparsers.add_parser("history", help="List past analyses, newest first")
+    history.add_argument("--lot", default=None, help="Lot name prefix")
+    history.add_argument("--since", type=datetime.fromisoformat, default=None)
+    history.add_argument("--until", type=datetime.fromisoformat, default=None)
+    history.add_argument("--limit", type=int, default=50)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    store = ResultStore(args.db or default_store_path())
+
+    if args.command == "history":
+        runs = store.history(lot=args.lot, since=args.since, until=args.until, limit=args.limit)
+        print(runs.to_string(index=False) if len(runs) else "No analyses found.")
+        return 0
+
+    if args.min_ele_flow >= args.max_ele_flow:
+        print("min-ele-flow must be smaller than max-ele-flow.", file=sys.stderr)
+        return 2
+    try:
+        output = run_analysis_pipeline(
+            args.path.read_bytes(),
+            args.path.name,
+            min_ele_flow=args.min_ele_flow,
+            max_ele_flow=args.max_ele_flow,
+            prediction_interval_pct=args.prediction_interval_pct,
+            store=None if args.no_store else store,
+            lot=args.lot,
+        )
+    except (OSError, ValueError) as exc:
+        print(f"Analysis failed: {exc}", file=sys.stderr)
+        return 1
+    report = {
+        "cached": output.cached,
+        "result": output.result.to_json_dict(),
+        "in_count": output.in_count,
+        "out_count": output.out_count,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
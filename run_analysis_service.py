@@ -0,0 +1,35 @@
+import argparse
+
+from src.service import AnalysisService, make_server
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local HTTP analysis service for MES integration.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count - 1)")
+    parser.add_argument("--quiet", action="store_true", help="Suppress per-request access logs")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    service = AnalysisService(workers=args.workers)
+    service.warm_up()
+    server = make_server(args.host, args.port, service, quiet=args.quiet)
+
+    print(f"[ServiceStart] workers={service.workers}")
+    print(f"[ServiceStart] listening on http://{args.host}:{args.port}")
+    print("[ServiceStart] endpoints: GET /health, POST /analyze, POST /analyze/batch")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,34 @@
 from .analysis import (
     AnalysisResult,
+    CSV_ENGINES,
+    ConformanceCurve,
+    FitStatistics,
+    INTERSECTION_ENGINES,
     REQUIRED_COLUMNS,
+    TABLE_FORMATS,
+    TableSummary,
     analyze_dataframe,
+    analyze_fit,
     build_figure,
+    compute_fit_statistics,
+    conformance_curve,
+    conformance_probability,
+    detect_table_format,
     load_and_validate_csv,
+    load_and_validate_table,
+    prediction_bounds,
+    read_table,
+    read_table_bytes,
+    sample_preview,
+    solve_interval_intersections,
+    summarize_table,
+    thin_scatter_points,
     validate_dataframe,
 )
 
+from .jobs import AnalysisJob, AnalysisJobRunner, JobCancelled
+from .pipeline import AnalysisOutput, analysis_cache_key, dataset_fingerprint, run_analysis_pipeline
+from .service import AnalysisService, analyze_payload, make_server
+from .memory import SessionMemoryManager, estimate_nbytes
+from .simulation import SeedSearchResult, SimulationSpec, generate_dataset, in_interval_counts, search_seeds
+from .store import ResultStore, StoredRun, default_store_path, make_cache_key
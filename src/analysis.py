@@ -1,12 +1,26 @@
-from dataclasses import dataclass
+import io
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional, Union
 
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import statsmodels.api as sm
+from scipy.special import stdtr, stdtrit
 
 
 REQUIRED_COLUMNS = ["F.S.Flux", "Ele.Flow"]
+TABLE_FORMATS = ("csv", "parquet", "feather")
+CSV_ENGINES = ("auto", "pyarrow", "c")
+INTERSECTION_ENGINES = ("exact", "polyfit")
+_FORMAT_SUFFIXES = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+}
 
 
 @dataclass(frozen=True)
@@ -17,12 +31,192 @@ class AnalysisResult:
     min_intersection: float
     max_intersection: float
 
+    @property
+    def has_range(self) -> bool:
+        return bool(np.isfinite(self.min_intersection) and np.isfinite(self.max_intersection))
 
-def load_and_validate_csv(file_path: str, encoding: str = "utf-8") -> pd.DataFrame:
-    df = pd.read_csv(file_path, encoding=encoding)
+    def to_json_dict(self) -> dict[str, Optional[float]]:
+        """Field dict with NaN/inf replaced by None, so it serializes to valid JSON (``null``)."""
+        return {name: value if np.isfinite(value) else None for name, value in asdict(self).items()}
+
+
+@dataclass(frozen=True)
+class FitStatistics:
+    n: int
+    slope: float
+    intercept: float
+    x_mean: float
+    sxx: float
+    residual_std: float
+    r_squared: float
+
+    @property
+    def df_resid(self) -> int:
+        return self.n - 2
+
+
+@dataclass(frozen=True)
+class ConformanceCurve:
+    x: np.ndarray
+    probability: np.ndarray
+    best_x: float
+    best_probability: float
+    target_probability: float
+    target_min: float
+    target_max: float
+
+
+@dataclass(frozen=True)
+class TableSummary:
+    row_count: int
+    invalid_row_count: int
+    stats: pd.DataFrame
+
+
+def _pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def detect_table_format(file_name: str) -> str:
+    suffix = Path(str(file_name)).suffix.lower()
+    if suffix not in _FORMAT_SUFFIXES:
+        raise ValueError(f"Unsupported file type: {suffix or file_name}")
+    return _FORMAT_SUFFIXES[suffix]
+
+
+def _rewind(source) -> None:
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def _read_csv_pyarrow(source, encoding: str) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    # Arrow strips a UTF-8 BOM itself, so utf-8-sig maps to its native decoder.
+    arrow_encoding = "utf8" if encoding.lower().replace("_", "-") in ("utf-8", "utf8", "utf-8-sig") else encoding
+    table = pa_csv.read_csv(
+        source,
+        read_options=pa_csv.ReadOptions(use_threads=True, encoding=arrow_encoding),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=REQUIRED_COLUMNS,
+            column_types={col: pa.float64() for col in REQUIRED_COLUMNS},
+        ),
+    )
+    return table.to_pandas()
+
+
+def _read_csv_c(source, encoding: str) -> pd.DataFrame:
+    options = dict(encoding=encoding, engine="c", usecols=lambda col: col in REQUIRED_COLUMNS)
+    try:
+        return pd.read_csv(source, dtype={col: "float64" for col in REQUIRED_COLUMNS}, **options)
+    except ValueError:
+        # Non-numeric cells: re-read untyped so validation reports the usual error.
+        _rewind(source)
+        return pd.read_csv(source, **options)
+
+
+def read_table(
+    source,
+    file_format: str = "csv",
+    encoding: str = "utf-8",
+    engine: str = "auto",
+) -> pd.DataFrame:
+    """Read only the required columns from a CSV, Parquet or Feather source.
+
+    For CSV, ``engine="auto"`` uses the multithreaded pyarrow reader when it is
+    installed and falls back to the pandas C parser if pyarrow is missing or
+    rejects the file (missing columns, non-numeric cells), so validation still
+    reports the usual errors. ``engine="pyarrow"`` never falls back and raises
+    pyarrow's error instead. Both engines return the required columns as float64.
+    """
+    if file_format not in TABLE_FORMATS:
+        raise ValueError(f"file_format must be one of {TABLE_FORMATS}.")
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"engine must be one of {CSV_ENGINES}.")
+
+    if file_format in ("parquet", "feather"):
+        reader = pd.read_parquet if file_format == "parquet" else pd.read_feather
+        try:
+            return reader(source, columns=REQUIRED_COLUMNS)
+        except (KeyError, ValueError):
+            # A required column is absent; read everything and let validation report it.
+            _rewind(source)
+            return reader(source)
+
+    if engine == "pyarrow" and not _pyarrow_available():
+        raise ImportError("engine='pyarrow' requires the pyarrow package.")
+    if engine == "pyarrow":
+        return _read_csv_pyarrow(source, encoding)
+    if engine == "auto" and _pyarrow_available():
+        try:
+            return _read_csv_pyarrow(source, encoding)
+        except (KeyError, ValueError):
+            _rewind(source)
+    return _read_csv_c(source, encoding)
+
+
+def load_and_validate_csv(file_path: str, encoding: str = "utf-8", engine: str = "auto") -> pd.DataFrame:
+    df = read_table(file_path, file_format="csv", encoding=encoding, engine=engine)
+    return validate_dataframe(df)
+
+
+def load_and_validate_table(file_path: str, encoding: str = "utf-8", engine: str = "auto") -> pd.DataFrame:
+    df = read_table(file_path, file_format=detect_table_format(file_path), encoding=encoding, engine=engine)
     return validate_dataframe(df)
 
 
+def read_table_bytes(raw: bytes, file_name: str, encoding: str = "utf-8-sig", engine: str = "auto") -> pd.DataFrame:
+    return read_table(io.BytesIO(raw), file_format=detect_table_format(file_name), encoding=encoding, engine=engine)
+
+
+def summarize_table(df: pd.DataFrame) -> TableSummary:
+    """Row count, invalid rows and min/max/mean of the required columns in one pass.
+
+    Rows with a missing or non-numeric required value count as invalid and are
+    excluded from the statistics.
+    """
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {missing_columns}")
+
+    values = np.column_stack(
+        [pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float) for col in REQUIRED_COLUMNS]
+    )
+    valid_mask = np.isfinite(values).all(axis=1)
+    valid = values[valid_mask]
+
+    if len(valid):
+        stats = pd.DataFrame(
+            [valid.min(axis=0), valid.max(axis=0), valid.mean(axis=0)],
+            index=["min", "max", "mean"],
+            columns=REQUIRED_COLUMNS,
+        )
+    else:
+        stats = pd.DataFrame(np.nan, index=["min", "max", "mean"], columns=REQUIRED_COLUMNS)
+
+    return TableSummary(
+        row_count=int(len(df)),
+        invalid_row_count=int(len(df) - np.count_nonzero(valid_mask)),
+        stats=stats,
+    )
+
+
+def sample_preview(df: pd.DataFrame, max_rows: int = 200, head_rows: int = 20, seed: int = 0) -> pd.DataFrame:
+    """Bounded preview: the first ``head_rows`` rows plus a random sample of the rest, in file order."""
+    if len(df) <= max_rows:
+        return df
+    head_rows = min(head_rows, max_rows)
+    rng = np.random.default_rng(seed)
+    sampled = rng.choice(np.arange(head_rows, len(df)), size=max_rows - head_rows, replace=False)
+    positions = np.concatenate([np.arange(head_rows), np.sort(sampled)])
+    return df.iloc[positions]
+
+
 def validate_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
     if missing_columns:
@@ -42,15 +236,56 @@ def validate_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     return validated
 
 
+def _check_prediction_interval_pct(prediction_interval_pct: float) -> None:
+    if not (0.0 < float(prediction_interval_pct) < 100.0):
+        raise ValueError("prediction_interval_pct must be between 0 and 100.")
+
+
+def _polyfit_intersections(
+    x: np.ndarray,
+    pred_summary: pd.DataFrame,
+    min_ele_flow: float,
+    max_ele_flow: float,
+) -> tuple[float, float]:
+    # Compatibility mode: straight lines fitted through the per-observation bounds.
+    lower_fit = np.polyfit(x, pred_summary["obs_ci_lower"].to_numpy(), deg=1)
+    upper_fit = np.polyfit(x, pred_summary["obs_ci_upper"].to_numpy(), deg=1)
+    a_lower, b_lower = float(lower_fit[0]), float(lower_fit[1])
+    a_upper, b_upper = float(upper_fit[0]), float(upper_fit[1])
+
+    if abs(a_lower) < 1e-12:
+        raise ZeroDivisionError("Lower CI fitted slope is too close to zero.")
+    if abs(a_upper) < 1e-12:
+        raise ZeroDivisionError("Upper CI fitted slope is too close to zero.")
+
+    min_intersection = (float(min_ele_flow) - b_lower) / a_lower
+    max_intersection = (float(max_ele_flow) - b_upper) / a_upper
+    return float(min_intersection), float(max_intersection)
+
+
 def analyze_dataframe(
     df: pd.DataFrame,
     min_ele_flow: float,
     max_ele_flow: float,
     prediction_interval_pct: float = 95.0,
-) -> tuple[AnalysisResult, pd.DataFrame, np.ndarray]:
+    engine: str = "exact",
+) -> tuple[AnalysisResult, Union[pd.DataFrame, FitStatistics], np.ndarray]:
+    """Fit and intersect in one call; returns (result, band, fitted_values).
+
+    ``band`` is the statsmodels prediction frame for ``engine="polyfit"`` and the
+    :class:`FitStatistics` in exact mode, where no frame is built. Either can be
+    passed straight to :func:`build_figure` as its ``pred_summary`` argument.
+    """
     validated = validate_dataframe(df)
-    if not (0.0 < float(prediction_interval_pct) < 100.0):
-        raise ValueError("prediction_interval_pct must be between 0 and 100.")
+    _check_prediction_interval_pct(prediction_interval_pct)
+    if engine not in INTERSECTION_ENGINES:
+        raise ValueError(f"engine must be one of {INTERSECTION_ENGINES}.")
+
+    if engine == "exact":
+        x_values = validated["F.S.Flux"].to_numpy(dtype=float)
+        stats = _fit_statistics(x_values, validated["Ele.Flow"].to_numpy(dtype=float))
+        result = analyze_fit(stats, min_ele_flow, max_ele_flow, prediction_interval_pct)
+        return result, stats, stats.intercept + stats.slope * x_values
 
     x = validated["F.S.Flux"].astype(float)
     y = validated["Ele.Flow"].astype(float)
@@ -59,50 +294,242 @@ def analyze_dataframe(
     model = sm.OLS(y, x_with_const).fit()
     alpha = 1.0 - float(prediction_interval_pct) / 100.0
     pred_summary = model.get_prediction(x_with_const).summary_frame(alpha=alpha)
+    min_intersection, max_intersection = _polyfit_intersections(
+        x.to_numpy(), pred_summary, min_ele_flow, max_ele_flow
+    )
 
-    slope = float(model.params["F.S.Flux"])
-    intercept = float(model.params["const"])
-    r_squared = float(model.rsquared)
+    result = AnalysisResult(
+        slope=float(model.params["F.S.Flux"]),
+        intercept=float(model.params["const"]),
+        r_squared=float(model.rsquared),
+        min_intersection=min_intersection,
+        max_intersection=max_intersection,
+    )
+    return result, pred_summary, model.fittedvalues.to_numpy()
 
-    lower_fit = np.polyfit(x.to_numpy(), pred_summary["obs_ci_lower"].to_numpy(), deg=1)
-    upper_fit = np.polyfit(x.to_numpy(), pred_summary["obs_ci_upper"].to_numpy(), deg=1)
-    a_lower, b_lower = float(lower_fit[0]), float(lower_fit[1])
-    a_upper, b_upper = float(upper_fit[0]), float(upper_fit[1])
 
-    if abs(a_lower) < 1e-12:
-        raise ZeroDivisionError("Lower CI fitted slope is too close to zero.")
-    if abs(a_upper) < 1e-12:
-        raise ZeroDivisionError("Upper CI fitted slope is too close to zero.")
+def analyze_fit(
+    stats: FitStatistics,
+    min_ele_flow: float,
+    max_ele_flow: float,
+    prediction_interval_pct: float = 95.0,
+) -> AnalysisResult:
+    """Exact intersections straight from the fit statistics, without a prediction frame."""
+    min_intersection, max_intersection = solve_interval_intersections(
+        stats, min_ele_flow, max_ele_flow, prediction_interval_pct
+    )
+    return AnalysisResult(
+        slope=stats.slope,
+        intercept=stats.intercept,
+        r_squared=stats.r_squared,
+        min_intersection=min_intersection,
+        max_intersection=max_intersection,
+    )
 
-    min_intersection = (float(min_ele_flow) - b_lower) / a_lower
-    max_intersection = (float(max_ele_flow) - b_upper) / a_upper
 
-    result = AnalysisResult(
+def compute_fit_statistics(df: pd.DataFrame) -> FitStatistics:
+    """Sufficient statistics of the OLS fit of Ele.Flow on F.S.Flux."""
+    validated = validate_dataframe(df)
+    return _fit_statistics(
+        validated["F.S.Flux"].to_numpy(dtype=float), validated["Ele.Flow"].to_numpy(dtype=float)
+    )
+
+
+def _fit_statistics(x: np.ndarray, y: np.ndarray) -> FitStatistics:
+    n = len(x)
+
+    x_mean = float(x.mean())
+    dx = x - x_mean
+    sxx = float(dx @ dx)
+    if sxx <= 0.0:
+        raise ValueError("F.S.Flux must contain at least two distinct values.")
+    slope = float(dx @ (y - y.mean())) / sxx
+    intercept = float(y.mean()) - slope * x_mean
+    residuals = y - (intercept + slope * x)
+    sse = float(residuals @ residuals)
+    dy = y - y.mean()
+    syy = float(dy @ dy)
+    residual_std = float(np.sqrt(sse / (n - 2)))
+
+    return FitStatistics(
+        n=n,
         slope=slope,
         intercept=intercept,
-        r_squared=r_squared,
-        min_intersection=float(min_intersection),
-        max_intersection=float(max_intersection),
+        x_mean=x_mean,
+        sxx=sxx,
+        residual_std=residual_std,
+        r_squared=1.0 - sse / syy if syy > 0.0 else float("nan"),
     )
-    return result, pred_summary, model.fittedvalues.to_numpy()
+
+
+def _prediction_t_scale(stats: FitStatistics, prediction_interval_pct: float) -> float:
+    _check_prediction_interval_pct(prediction_interval_pct)
+    t_value = float(stdtrit(stats.df_resid, 0.5 + float(prediction_interval_pct) / 200.0))
+    return t_value * stats.residual_std
+
+
+def prediction_bounds(
+    stats: FitStatistics,
+    x_values,
+    prediction_interval_pct: float = 95.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Exact lower/upper prediction bounds (statsmodels ``obs_ci_*``) at arbitrary F.S.Flux values."""
+    x = np.asarray(x_values, dtype=float)
+    center = stats.intercept + stats.slope * x
+    half_width = _prediction_t_scale(stats, prediction_interval_pct) * np.sqrt(
+        1.0 + 1.0 / stats.n + (x - stats.x_mean) ** 2 / stats.sxx
+    )
+    return center - half_width, center + half_width
+
+
+def _solve_bound_crossing(stats: FitStatistics, limit: float, q: float, side: int) -> float:
+    # Solve  yhat(x) + side * q * h(x) = limit  with h(x) = sqrt(1 + 1/n + (x - xbar)^2 / Sxx).
+    # Squaring gives a quadratic; roots on the wrong side of the fitted line are discarded.
+    a = stats.slope
+    b = stats.intercept - float(limit)
+    k = q * q / stats.sxx
+    m = stats.x_mean
+    qa = a * a - k
+    qb = 2.0 * a * b + 2.0 * k * m
+    qc = b * b - q * q * (1.0 + 1.0 / stats.n) - k * m * m
+
+    if abs(qa) <= 1e-12 * max(a * a, k, 1e-300):
+        roots = [-qc / qb] if qb != 0.0 else []
+    else:
+        disc = qb * qb - 4.0 * qa * qc
+        if disc < 0.0:
+            return float("nan")
+        # Numerically stable form of the quadratic formula.
+        half = -0.5 * (qb + np.copysign(np.sqrt(disc), qb))
+        roots = [half / qa, qc / half] if half != 0.0 else [0.0]
+
+    tolerance = 1e-9 * max(abs(b), q, 1.0)
+    valid = sorted(float(r) for r in roots if -side * (a * r + b) >= -tolerance)
+    if not valid:
+        return float("nan")
+    # Pick the crossing on the branch that moves with the regression slope
+    # (the only one whenever the slope is significant).
+    increasing_branch_first = (side < 0) == (a > 0)
+    return valid[0] if increasing_branch_first else valid[-1]
+
+
+def solve_interval_intersections(
+    stats: FitStatistics,
+    min_ele_flow: float,
+    max_ele_flow: float,
+    prediction_interval_pct: float = 95.0,
+) -> tuple[float, float]:
+    """F.S.Flux where the exact lower bound meets ``min_ele_flow`` and the upper bound meets ``max_ele_flow``.
+
+    Closed-form, O(1) after the fit. A bound that never reaches its limit yields NaN.
+    """
+    q = _prediction_t_scale(stats, prediction_interval_pct)
+    return (
+        _solve_bound_crossing(stats, min_ele_flow, q, side=-1),
+        _solve_bound_crossing(stats, max_ele_flow, q, side=1),
+    )
+
+
+def conformance_probability(
+    stats: FitStatistics,
+    x_values,
+    min_ele_flow: float,
+    max_ele_flow: float,
+) -> np.ndarray:
+    """P(min_ele_flow <= Ele.Flow <= max_ele_flow) at each F.S.Flux under the t-predictive distribution."""
+    x = np.asarray(x_values, dtype=float)
+    center = stats.intercept + stats.slope * x
+    scale = stats.residual_std * np.sqrt(1.0 + 1.0 / stats.n + (x - stats.x_mean) ** 2 / stats.sxx)
+    upper = stdtr(stats.df_resid, (float(max_ele_flow) - center) / scale)
+    lower = stdtr(stats.df_resid, (float(min_ele_flow) - center) / scale)
+    return np.clip(upper - lower, 0.0, 1.0)
+
+
+def conformance_curve(
+    stats: FitStatistics,
+    x_values,
+    min_ele_flow: float,
+    max_ele_flow: float,
+    target_probability: float = 0.95,
+) -> ConformanceCurve:
+    """Evaluate the conformance probability over candidate F.S.Flux values in one vectorized call.
+
+    ``target_min``/``target_max`` bound the candidates whose probability reaches
+    ``target_probability`` (NaN when none do).
+    """
+    if not (0.0 < float(target_probability) < 1.0):
+        raise ValueError("target_probability must be between 0 and 1.")
+    x = np.asarray(x_values, dtype=float)
+    if x.size == 0:
+        raise ValueError("x_values must not be empty.")
+
+    probability = conformance_probability(stats, x, min_ele_flow, max_ele_flow)
+    best = int(np.argmax(probability))
+    above = x[probability >= float(target_probability)]
+
+    return ConformanceCurve(
+        x=x,
+        probability=probability,
+        best_x=float(x[best]),
+        best_probability=float(probability[best]),
+        target_probability=float(target_probability),
+        target_min=float(above.min()) if above.size else float("nan"),
+        target_max=float(above.max()) if above.size else float("nan"),
+    )
+
+
+def thin_scatter_points(figure: go.Figure, max_points: int) -> go.Figure:
+    """Copy of ``figure`` whose marker-only traces share at most ``max_points`` sampled points.
+
+    Lines, the prediction band and the range markers are kept whole, so the plot
+    still shows the full fit while far less data is sent to the browser.
+    """
+    thinned = go.Figure(figure)
+    scatter = [trace for trace in thinned.data if trace.mode == "markers" and trace.x is not None]
+    total = sum(len(trace.x) for trace in scatter)
+    if total <= max_points:
+        return thinned
+    rng = np.random.default_rng(0)
+    for trace in scatter:
+        n = len(trace.x)
+        keep = np.sort(rng.choice(n, size=min(n, max(1, round(max_points * n / total))), replace=False))
+        trace.x = np.asarray(trace.x)[keep]
+        trace.y = np.asarray(trace.y)[keep]
+    return thinned
 
 
 def build_figure(
     df: pd.DataFrame,
-    pred_summary: pd.DataFrame,
-    fitted_values: np.ndarray,
+    pred_summary: Union[pd.DataFrame, FitStatistics, None],
+    fitted_values: Optional[np.ndarray],
     result: AnalysisResult,
     min_ele_flow: float,
     max_ele_flow: float,
     prediction_interval_pct: float = 95.0,
+    conformance: Optional[ConformanceCurve] = None,
+    stats: Optional[FitStatistics] = None,
+    observation_bounds: Optional[tuple[np.ndarray, np.ndarray]] = None,
 ) -> go.Figure:
+    """Scatter, regression line, prediction band, limits and the F.S.Flux range.
+
+    With ``stats`` (or a :class:`FitStatistics` as ``pred_summary``, as returned by
+    :func:`analyze_dataframe` in exact mode) the exact (hyperbolic) band is drawn
+    from the fit statistics; otherwise the band is the straight-line polyfit
+    through the ``pred_summary`` frame (compatibility mode). ``observation_bounds``
+    are the per-row (lower, upper) bounds if the caller already computed them.
+    """
+    if isinstance(pred_summary, FitStatistics):
+        stats, pred_summary = pred_summary, None
+    if stats is None and pred_summary is None:
+        raise ValueError("Either pred_summary or stats is required.")
     x = df["F.S.Flux"].astype(float)
     y = df["Ele.Flow"].astype(float)
     x_candidates = np.array([x.min(), x.max(), result.min_intersection, result.max_intersection], dtype=float)
     y_candidates = np.array([y.min(), y.max(), float(min_ele_flow), float(max_ele_flow)], dtype=float)
 
-    x_min = float(np.min(x_candidates))
-    x_max = float(np.max(x_candidates))
+    # Exact intersections are NaN when a bound never reaches its limit.
+    x_min = float(np.nanmin(x_candidates))
+    x_max = float(np.nanmax(x_candidates))
     y_min = float(np.min(y_candidates))
     y_max = float(np.max(y_candidates))
 
@@ -120,13 +547,20 @@ def build_figure(
 
     x_line = np.linspace(x_plot_min, x_plot_max, 200)
     reg_line = result.slope * x_line + result.intercept
-    lower_fit = np.polyfit(x.to_numpy(), pred_summary["obs_ci_lower"].to_numpy(), deg=1)
-    upper_fit = np.polyfit(x.to_numpy(), pred_summary["obs_ci_upper"].to_numpy(), deg=1)
-    ci_lower_line = lower_fit[0] * x_line + lower_fit[1]
-    ci_upper_line = upper_fit[0] * x_line + upper_fit[1]
+    if stats is not None:
+        ci_lower_line, ci_upper_line = prediction_bounds(stats, x_line, prediction_interval_pct)
+        if observation_bounds is not None:
+            obs_ci_lower, obs_ci_upper = observation_bounds
+        else:
+            obs_ci_lower, obs_ci_upper = prediction_bounds(stats, x.to_numpy(), prediction_interval_pct)
+    else:
+        lower_fit = np.polyfit(x.to_numpy(), pred_summary["obs_ci_lower"].to_numpy(), deg=1)
+        upper_fit = np.polyfit(x.to_numpy(), pred_summary["obs_ci_upper"].to_numpy(), deg=1)
+        ci_lower_line = lower_fit[0] * x_line + lower_fit[1]
+        ci_upper_line = upper_fit[0] * x_line + upper_fit[1]
 
-    obs_ci_upper = pred_summary["obs_ci_upper"].to_numpy()
-    obs_ci_lower = pred_summary["obs_ci_lower"].to_numpy()
+        obs_ci_upper = pred_summary["obs_ci_upper"].to_numpy()
+        obs_ci_lower = pred_summary["obs_ci_lower"].to_numpy()
     in_interval_mask = (y.to_numpy() <= obs_ci_upper) & (y.to_numpy() >= obs_ci_lower)
     out_interval_mask = ~in_interval_mask
 
@@ -231,6 +665,28 @@ def build_figure(
             font=dict(color="#b71c1c"),
         )
 
+    if conformance is not None:
+        fig.add_trace(
+            go.Scatter(
+                x=conformance.x,
+                y=conformance.probability,
+                mode="lines",
+                line=dict(color="#6a1b9a", width=2),
+                name="適合確率",
+                yaxis="y2",
+            )
+        )
+        fig.update_layout(
+            yaxis2=dict(
+                title="適合確率",
+                overlaying="y",
+                side="right",
+                range=[0.0, 1.05],
+                tickformat=".0%",
+                showgrid=False,
+            )
+        )
+
     fig.update_layout(
         xaxis_title="F.S.Flux",
         yaxis_title="Ele.Flow",
@@ -247,11 +703,14 @@ def build_figure(
         ),
     )
     fig.update_xaxes(range=[x_plot_min, x_plot_max])
-    fig.update_yaxes(
-        range=[y_plot_min, y_plot_max],
-        tickformat=",.0f",
-        separatethousands=True,
-        exponentformat="none",
-        tickfont=dict(size=15),
+    # Primary axis only: the conformance overlay keeps its own 0-100% axis.
+    fig.update_layout(
+        yaxis=dict(
+            range=[y_plot_min, y_plot_max],
+            tickformat=",.0f",
+            separatethousands=True,
+            exponentformat="none",
+            tickfont=dict(size=15),
+        )
     )
     return fig
@@ -0,0 +1,100 @@
+import threading
+from concurrent.futures import CancelledError, Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class AnalysisJob:
+    """Handle for one submitted run: progress is polled, cancellation is cooperative.
+
+    :meth:`cancel` removes a job that has not started yet. A running job only stops at
+    its next :meth:`report` call, so a stage already in progress (e.g. the fit) runs to
+    completion and keeps its pool thread until then.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.progress = 0
+        self.message = "待機中"
+        self._cancel_event = threading.Event()
+        self._future: Optional[Future] = None
+
+    def report(self, value: int, message: str) -> None:
+        if self._cancel_event.is_set():
+            raise JobCancelled(f"Job {self.key} was cancelled.")
+        self.progress = int(value)
+        self.message = message
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+        if self._future is not None:
+            self._future.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def done(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    def failed(self) -> bool:
+        return self.done() and self.error() is not None
+
+    def error(self) -> Optional[BaseException]:
+        if not self.done():
+            return None
+        try:
+            return self._future.exception()
+        except CancelledError as exc:
+            return exc
+
+    def result(self) -> Any:
+        return self._future.result()
+
+
+class AnalysisJobRunner:
+    """Per-session job table backed by a (possibly shared) executor.
+
+    Submitting a key that is already running or finished successfully returns the
+    existing job, so reruns and repeated clicks do not queue duplicate work.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, max_workers: int = 2) -> None:
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self._jobs: dict[str, AnalysisJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> AnalysisJob:
+        """Run ``fn(*args, progress=job.report, **kwargs)`` in the background."""
+        with self._lock:
+            existing = self._jobs.get(key)
+            if existing is not None and not existing.cancelled and not existing.failed():
+                return existing
+
+            job = AnalysisJob(key)
+            job._future = self._executor.submit(fn, *args, progress=job.report, **kwargs)
+            self._jobs[key] = job
+            return job
+
+    def get(self, key: Optional[str]) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(key) if key is not None else None
+
+    def pop(self, key: str) -> Optional[AnalysisJob]:
+        """Forget a job without cancelling it, e.g. once its result is stored elsewhere."""
+        with self._lock:
+            return self._jobs.pop(key, None)
+
+    def cancel_stale(self, current_key: Optional[str]) -> int:
+        """Cancel and forget every job whose key no longer matches the current inputs.
+
+        Running jobs stop at their next progress report, not immediately.
+        """
+        with self._lock:
+            stale = [key for key in self._jobs if key != current_key]
+            for key in stale:
+                self._jobs.pop(key).cancel()
+            return len(stale)
@@ -0,0 +1,226 @@
+import atexit
+import dataclasses
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+
+def estimate_nbytes(obj: Any) -> int:
+    """Approximate resident size of an artifact, counting DataFrame/array buffers."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if isinstance(obj, go.Figure):
+        return len(obj.to_json())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(item) for item in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in obj.items())
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(getattr(obj, f.name)) for f in dataclasses.fields(obj))
+    return sys.getsizeof(obj)
+
+
+@dataclass
+class _Artifact:
+    session_id: str
+    name: str
+    nbytes: int
+    last_access: float
+    value: Any = None
+    spill_path: Optional[Path] = None
+
+    @property
+    def in_memory(self) -> bool:
+        return self.spill_path is None
+
+
+class SessionMemoryManager:
+    """Server-wide LRU accounting of per-session artifacts with per-session and global caps.
+
+    When a cap is exceeded the least-recently-used in-memory artifacts are pickled to
+    ``spill_dir`` and transparently reloaded by :meth:`get`. Artifacts that cannot be
+    pickled are dropped instead. An artifact larger than a cap stays on disk and is
+    read from its spill file on each :meth:`get` without being rewritten.
+
+    Spill files live in a private subdirectory of ``spill_dir`` that is removed by
+    :meth:`close` and at interpreter exit. Uploaded bytes owned by the caller (e.g.
+    Streamlit's upload manager) can be reported with :meth:`record_upload`; they are
+    shown in :meth:`usage` but not capped, since they cannot be evicted from here.
+    """
+
+    def __init__(
+        self,
+        session_cap_bytes: int,
+        global_cap_bytes: int,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        if session_cap_bytes <= 0 or global_cap_bytes <= 0:
+            raise ValueError("Memory caps must be positive.")
+        self.session_cap_bytes = int(session_cap_bytes)
+        self.global_cap_bytes = int(global_cap_bytes)
+        if spill_dir:
+            Path(spill_dir).mkdir(parents=True, exist_ok=True)
+        self.spill_dir = Path(tempfile.mkdtemp(prefix="flux_spill_", dir=spill_dir))
+        self._artifacts: "OrderedDict[tuple[str, str], _Artifact]" = OrderedDict()
+        self._upload_bytes: dict[str, int] = {}
+        self._last_seen: dict[str, float] = {}
+        self._lock = threading.RLock()
+        atexit.register(self.close)
+
+    def close(self) -> None:
+        with self._lock:
+            self._artifacts.clear()
+            self._upload_bytes.clear()
+            self._last_seen.clear()
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def put(self, session_id: str, name: str, value: Any) -> None:
+        with self._lock:
+            self._remove((session_id, name))
+            self._artifacts[(session_id, name)] = _Artifact(
+                session_id=session_id,
+                name=name,
+                nbytes=estimate_nbytes(value),
+                last_access=time.time(),
+                value=value,
+            )
+            self._last_seen[session_id] = time.time()
+            self._enforce_caps(session_id)
+
+    def get(self, session_id: str, name: str) -> Any:
+        with self._lock:
+            artifact = self._artifacts.get((session_id, name))
+            if artifact is None:
+                return None
+            artifact.last_access = self._last_seen[session_id] = time.time()
+            self._artifacts.move_to_end((session_id, name))
+            if artifact.in_memory:
+                return artifact.value
+
+            with artifact.spill_path.open("rb") as f:
+                value = pickle.load(f)
+            if artifact.nbytes > min(self.session_cap_bytes, self.global_cap_bytes):
+                # Could never stay resident: serve it from the spill file as-is.
+                return value
+            artifact.spill_path.unlink(missing_ok=True)
+            artifact.spill_path = None
+            artifact.value = value
+            self._enforce_caps(session_id)
+            return value
+
+    def record_upload(self, session_id: str, nbytes: int) -> None:
+        with self._lock:
+            self._upload_bytes[session_id] = int(nbytes)
+            self._last_seen[session_id] = time.time()
+
+    def discard(self, session_id: str, name: str) -> None:
+        with self._lock:
+            self._remove((session_id, name))
+
+    def drop_session(self, session_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._artifacts if key[0] == session_id]:
+                self._remove(key)
+            self._upload_bytes.pop(session_id, None)
+            self._last_seen.pop(session_id, None)
+
+    def sessions(self) -> list[str]:
+        with self._lock:
+            return list(self._last_seen)
+
+    def reap_sessions(
+        self,
+        is_alive: Optional[Callable[[str], bool]] = None,
+        max_idle_seconds: Optional[float] = None,
+    ) -> list[str]:
+        """Drop sessions that ``is_alive`` rejects or that were idle longer than ``max_idle_seconds``."""
+        now = time.time()
+        with self._lock:
+            dead = [
+                session_id
+                for session_id, last_seen in self._last_seen.items()
+                if (is_alive is not None and not is_alive(session_id))
+                or (max_idle_seconds is not None and now - last_seen > max_idle_seconds)
+            ]
+            for session_id in dead:
+                self.drop_session(session_id)
+            return dead
+
+    def memory_bytes(self, session_id: Optional[str] = None) -> int:
+        with self._lock:
+            return sum(
+                a.nbytes
+                for a in self._artifacts.values()
+                if a.in_memory and (session_id is None or a.session_id == session_id)
+            )
+
+    def usage(self) -> pd.DataFrame:
+        """One row per session: artifact count, resident, spilled and upload bytes, and last access."""
+        with self._lock:
+            rows = {
+                session_id: {
+                    "session": session_id,
+                    "artifacts": 0,
+                    "memory_bytes": 0,
+                    "spilled_bytes": 0,
+                    "upload_bytes": self._upload_bytes.get(session_id, 0),
+                    "last_access": last_seen,
+                }
+                for session_id, last_seen in self._last_seen.items()
+            }
+            for a in self._artifacts.values():
+                row = rows[a.session_id]
+                row["artifacts"] += 1
+                row["memory_bytes" if a.in_memory else "spilled_bytes"] += a.nbytes
+        usage = pd.DataFrame(
+            list(rows.values()),
+            columns=["session", "artifacts", "memory_bytes", "spilled_bytes", "upload_bytes", "last_access"],
+        )
+        usage["last_access"] = pd.to_datetime(usage["last_access"], unit="s")
+        return usage.sort_values("memory_bytes", ascending=False, ignore_index=True)
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        artifact = self._artifacts.pop(key, None)
+        if artifact is not None and artifact.spill_path is not None:
+            artifact.spill_path.unlink(missing_ok=True)
+
+    def _enforce_caps(self, session_id: str) -> None:
+        while self.memory_bytes(session_id) > self.session_cap_bytes:
+            self._evict_lru(session_id)
+        while self.memory_bytes() > self.global_cap_bytes:
+            self._evict_lru(None)
+
+    def _evict_lru(self, session_id: Optional[str]) -> None:
+        for key, artifact in self._artifacts.items():
+            if artifact.in_memory and (session_id is None or artifact.session_id == session_id):
+                break
+        else:
+            return
+
+        path = self.spill_dir / f"{uuid.uuid4().hex}.pkl"
+        try:
+            with path.open("wb") as f:
+                pickle.dump(artifact.value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            path.unlink(missing_ok=True)
+            self._remove(key)
+            return
+        artifact.spill_path = path
+        artifact.value = None
@@ -0,0 +1,195 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+import plotly.graph_objects as go
+
+from .analysis import (
+    AnalysisResult,
+    ConformanceCurve,
+    FitStatistics,
+    analyze_fit,
+    build_figure,
+    compute_fit_statistics,
+    conformance_curve,
+    prediction_bounds,
+    read_table_bytes,
+    thin_scatter_points,
+    validate_dataframe,
+)
+from .store import ResultStore, make_cache_key
+
+
+ProgressCallback = Callable[[int, str], None]
+CONFORMANCE_GRID_POINTS = 2000
+INTERSECTION_ENGINE = "exact"
+
+
+@dataclass(frozen=True)
+class AnalysisOutput:
+    result: AnalysisResult
+    prediction_interval_pct: float
+    in_count: int
+    out_count: int
+    figure: go.Figure
+    conformance: Optional[ConformanceCurve] = None
+    stats: Optional[FitStatistics] = None
+    cached: bool = False
+
+    @property
+    def in_ratio_pct(self) -> float:
+        total = self.in_count + self.out_count
+        return self.in_count / total * 100.0 if total else 0.0
+
+
+def dataset_fingerprint(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def analysis_cache_key(
+    dataset_hash: str,
+    min_ele_flow: float,
+    max_ele_flow: float,
+    prediction_interval_pct: float = 95.0,
+    conformance_target: Optional[float] = None,
+) -> str:
+    """Results-store key of a pipeline run; the lot is per-run history, not part of the key."""
+    return make_cache_key(
+        dataset_hash,
+        min_ele_flow,
+        max_ele_flow,
+        prediction_interval_pct,
+        engine=INTERSECTION_ENGINE,
+        conformance_target=conformance_target,
+    )
+
+
+def _conformance_grid(x: np.ndarray, result: AnalysisResult) -> np.ndarray:
+    # Same span as the plot: data range plus both intersections, padded by 10%.
+    candidates = np.array([x.min(), x.max(), result.min_intersection, result.max_intersection], dtype=float)
+    candidates = candidates[np.isfinite(candidates)]
+    lo, hi = float(candidates.min()), float(candidates.max())
+    pad = (hi - lo) * 0.1 or max(abs(lo) * 0.1, 1.0)
+    return np.linspace(lo - pad, hi + pad, CONFORMANCE_GRID_POINTS)
+
+
+def _no_progress(value: int, message: str) -> None:
+    return None
+
+
+def run_analysis_pipeline(
+    raw: bytes,
+    file_name: str,
+    min_ele_flow: float,
+    max_ele_flow: float,
+    prediction_interval_pct: float = 95.0,
+    conformance_target: Optional[float] = None,
+    progress: Optional[ProgressCallback] = None,
+    store: Optional[ResultStore] = None,
+    lot: Optional[str] = None,
+    figure_max_points: Optional[int] = None,
+) -> AnalysisOutput:
+    """Parse, validate, fit and plot an uploaded file without touching any UI state.
+
+    With ``conformance_target`` set, the conformance-probability curve is evaluated
+    and overlaid on the figure. ``progress`` is called at each stage; it may raise
+    to abort the run between stages. With a ``store``, a previous run on the same
+    bytes and parameters is returned without parsing or fitting; either way the run
+    is added to the store's history under ``lot``. With ``figure_max_points`` set,
+    the scatter points of the returned figure are sampled down to that many.
+    """
+    report = progress or _no_progress
+
+    report(0, "開始しました")
+    if store is not None:
+        dataset_hash = dataset_fingerprint(raw)
+        cache_key = analysis_cache_key(
+            dataset_hash, min_ele_flow, max_ele_flow, prediction_interval_pct, conformance_target
+        )
+        stored = store.get(cache_key)
+        if stored is not None:
+            store.record_run(cache_key, lot=lot)
+            report(100, "完了（保存済みの結果）")
+            return AnalysisOutput(
+                result=stored.result,
+                prediction_interval_pct=stored.prediction_interval_pct,
+                in_count=stored.in_count,
+                out_count=stored.out_count,
+                figure=stored.figure,
+                conformance=stored.conformance,
+                stats=stored.stats,
+                cached=True,
+            )
+
+    report(20, "CSVを読み込み中")
+    df = read_table_bytes(raw, file_name)
+
+    report(40, "データを検証中")
+    validated_df = validate_dataframe(df)
+
+    report(65, "回帰分析を実行中")
+    # Fit statistics are O(1) to solve against; no per-observation prediction frame is built.
+    stats = compute_fit_statistics(validated_df)
+    result = analyze_fit(stats, min_ele_flow, max_ele_flow, prediction_interval_pct)
+
+    x_values = validated_df["F.S.Flux"].to_numpy(dtype=float)
+    y_values = validated_df["Ele.Flow"].to_numpy(dtype=float)
+    obs_lower, obs_upper = prediction_bounds(stats, x_values, prediction_interval_pct)
+    in_count = int(np.count_nonzero((y_values <= obs_upper) & (y_values >= obs_lower)))
+
+    conformance = None
+    if conformance_target is not None:
+        conformance = conformance_curve(
+            stats,
+            _conformance_grid(x_values, result),
+            min_ele_flow=min_ele_flow,
+            max_ele_flow=max_ele_flow,
+            target_probability=conformance_target,
+        )
+
+    report(85, "グラフを作成中")
+    fig = build_figure(
+        validated_df,
+        None,
+        None,
+        result,
+        min_ele_flow=min_ele_flow,
+        max_ele_flow=max_ele_flow,
+        prediction_interval_pct=prediction_interval_pct,
+        conformance=conformance,
+        stats=stats,
+        observation_bounds=(obs_lower, obs_upper),
+    )
+    if figure_max_points is not None:
+        fig = thin_scatter_points(fig, figure_max_points)
+
+    output = AnalysisOutput(
+        result=result,
+        prediction_interval_pct=float(prediction_interval_pct),
+        in_count=in_count,
+        out_count=int(len(y_values) - in_count),
+        figure=fig,
+        conformance=conformance,
+        stats=stats,
+    )
+    if store is not None:
+        store.put(
+            cache_key,
+            dataset_hash,
+            min_ele_flow,
+            max_ele_flow,
+            prediction_interval_pct,
+            engine=INTERSECTION_ENGINE,
+            result=result,
+            stats=stats,
+            in_count=output.in_count,
+            out_count=output.out_count,
+            figure=fig,
+            conformance=conformance,
+            conformance_target=conformance_target,
+            lot=lot,
+        )
+
+    report(100, "完了")
+    return output
@@ -0,0 +1,173 @@
+import io
+import json
+import math
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from .analysis import analyze_fit, compute_fit_statistics, read_table
+
+
+PAYLOAD_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/json": "json",
+    "application/vnd.apache.arrow.file": "feather",
+    "application/x-parquet": "parquet",
+}
+ANALYSIS_PARAMS = ("min_ele_flow", "max_ele_flow", "prediction_interval_pct")
+
+
+def _warm_worker() -> None:
+    # Pay the model imports and first-fit cost once per worker, not on the first request.
+    analyze_fit(
+        compute_fit_statistics(pd.DataFrame({"F.S.Flux": [1.0, 2.0, 3.0], "Ele.Flow": [1.0, 2.1, 2.9]})),
+        min_ele_flow=1.5,
+        max_ele_flow=2.5,
+    )
+
+
+def _noop() -> None:
+    return None
+
+
+def parse_analysis_params(values: dict[str, Any]) -> dict[str, float]:
+    missing = [name for name in ANALYSIS_PARAMS[:2] if name not in values]
+    if missing:
+        raise ValueError(f"Missing analysis parameters: {missing}")
+    params = {}
+    for name in ANALYSIS_PARAMS:
+        if name not in values:
+            continue
+        value = values[name]
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError(f"{name} must be a number.")
+        try:
+            params[name] = float(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a number.") from None
+        if not math.isfinite(params[name]):
+            raise ValueError(f"{name} must be a finite number.")
+    if params["min_ele_flow"] >= params["max_ele_flow"]:
+        raise ValueError("min_ele_flow must be smaller than max_ele_flow.")
+    return params
+
+
+def _frame_from_json(item: dict[str, Any]) -> pd.DataFrame:
+    if "data" in item:
+        # Either {"col": [...]} or [{"col": v, ...}, ...]; pandas accepts both.
+        return pd.DataFrame(item["data"])
+    if "csv" in item:
+        if not isinstance(item["csv"], str):
+            raise ValueError("'csv' must be a string.")
+        return read_table(io.StringIO(item["csv"]), file_format="csv", engine="c")
+    raise ValueError("JSON payload needs a 'data' or 'csv' field.")
+
+
+def analyze_payload(payload: bytes, payload_format: str, params: dict[str, Any]) -> dict[str, Any]:
+    """Parse one payload and return the analysis result as a JSON-ready dict.
+
+    For ``json`` payloads the analysis parameters are read from the body and
+    override ``params``; other formats take them from ``params`` only.
+    """
+    if payload_format == "json":
+        item = json.loads(payload)
+        if not isinstance(item, dict):
+            raise ValueError("JSON payload must be an object.")
+        df = _frame_from_json(item)
+        params = {**params, **{name: item[name] for name in ANALYSIS_PARAMS if name in item}}
+    else:
+        df = read_table(io.BytesIO(payload), file_format=payload_format)
+
+    result = analyze_fit(compute_fit_statistics(df), **parse_analysis_params(params))
+    return result.to_json_dict()
+
+
+class AnalysisService:
+    """Process pool of pre-warmed workers running :func:`analyze_payload`."""
+
+    def __init__(self, workers: Optional[int] = None, executor: Optional[Executor] = None) -> None:
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self._executor = executor or ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+
+    def warm_up(self) -> None:
+        # Start every worker now so the initializer runs before the first request arrives;
+        # the submitted task itself does nothing.
+        for future in [self._executor.submit(_noop) for _ in range(self.workers)]:
+            future.result()
+
+    def analyze(self, payload: bytes, payload_format: str, params: dict[str, Any]) -> dict[str, Any]:
+        return self._executor.submit(analyze_payload, payload, payload_format, params).result()
+
+    def analyze_batch(self, items: list[dict[str, Any]], params: dict[str, Any]) -> list[dict[str, Any]]:
+        futures = [
+            self._executor.submit(analyze_payload, json.dumps(item).encode("utf-8"), "json", params) for item in items
+        ]
+        responses = []
+        for future in futures:
+            try:
+                responses.append({"result": future.result()})
+            except (ValueError, TypeError, ZeroDivisionError) as exc:
+                # One bad item must not fail the whole batch.
+                responses.append({"error": str(exc)})
+        return responses
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    server_version = "FluxBoundService/1.0"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not getattr(self.server, "quiet", False):
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: Any) -> None:
+        encoded = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path == "/health":
+            self._send_json(200, {"status": "ok", "workers": self.server.service.workers})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        payload = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        content_type = self.headers.get("Content-Type", "application/json").split(";")[0].strip().lower()
+        service = self.server.service
+
+        try:
+            if url.path == "/analyze":
+                if content_type not in PAYLOAD_CONTENT_TYPES:
+                    raise ValueError(f"Unsupported Content-Type: {content_type}")
+                self._send_json(200, {"result": service.analyze(payload, PAYLOAD_CONTENT_TYPES[content_type], params)})
+            elif url.path == "/analyze/batch":
+                body = json.loads(payload)
+                items = body.get("items") if isinstance(body, dict) else None
+                if not isinstance(items, list):
+                    raise ValueError("Batch payload must be an object with an 'items' list.")
+                self._send_json(200, {"results": service.analyze_batch(items, params)})
+            else:
+                self._send_json(404, {"error": "Not found"})
+        except (ValueError, ZeroDivisionError) as exc:
+            self._send_json(400, {"error": str(exc)})
+        except Exception as exc:
+            self._send_json(500, {"error": str(exc)})
+
+
+def make_server(host: str, port: int, service: AnalysisService, quiet: bool = False) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+    server.service = service
+    server.quiet = quiet
+    return server
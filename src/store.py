@@ -0,0 +1,343 @@
+import json
+import os
+import sqlite3
+import zlib
+from contextlib import closing
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from .analysis import AnalysisResult, ConformanceCurve, FitStatistics, thin_scatter_points
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_results (
+    id INTEGER PRIMARY KEY,
+    cache_key TEXT NOT NULL UNIQUE,
+    dataset_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    min_ele_flow REAL NOT NULL,
+    max_ele_flow REAL NOT NULL,
+    prediction_interval_pct REAL NOT NULL,
+    engine TEXT NOT NULL,
+    conformance_target REAL,
+    slope REAL NOT NULL,
+    intercept REAL NOT NULL,
+    r_squared REAL,
+    min_intersection REAL,
+    max_intersection REAL,
+    n INTEGER NOT NULL,
+    x_mean REAL NOT NULL,
+    sxx REAL NOT NULL,
+    residual_std REAL NOT NULL,
+    in_count INTEGER NOT NULL,
+    out_count INTEGER NOT NULL,
+    conformance BLOB,
+    figure BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analysis_history (
+    id INTEGER PRIMARY KEY,
+    result_id INTEGER NOT NULL REFERENCES analysis_results (id),
+    lot TEXT,
+    created_at TEXT NOT NULL,
+    cached INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_dataset ON analysis_results (dataset_hash);
+CREATE INDEX IF NOT EXISTS idx_results_params ON analysis_results (min_ele_flow, max_ele_flow, prediction_interval_pct);
+CREATE INDEX IF NOT EXISTS idx_results_max_flow ON analysis_results (max_ele_flow);
+CREATE INDEX IF NOT EXISTS idx_results_pct ON analysis_results (prediction_interval_pct);
+CREATE INDEX IF NOT EXISTS idx_history_lot ON analysis_history (lot, created_at);
+CREATE INDEX IF NOT EXISTS idx_history_created ON analysis_history (created_at);
+CREATE INDEX IF NOT EXISTS idx_history_result ON analysis_history (result_id);
+"""
+
+# Output column -> source column; per-run fields come from the history row, the rest from its result.
+_HISTORY_SOURCES = {
+    "id": "h.id",
+    "created_at": "h.created_at",
+    "lot": "h.lot",
+    "cached": "h.cached",
+    "dataset_hash": "r.dataset_hash",
+    "min_ele_flow": "r.min_ele_flow",
+    "max_ele_flow": "r.max_ele_flow",
+    "prediction_interval_pct": "r.prediction_interval_pct",
+    "engine": "r.engine",
+    "slope": "r.slope",
+    "intercept": "r.intercept",
+    "r_squared": "r.r_squared",
+    "min_intersection": "r.min_intersection",
+    "max_intersection": "r.max_intersection",
+    "n": "r.n",
+    "in_count": "r.in_count",
+    "out_count": "r.out_count",
+}
+HISTORY_COLUMNS = list(_HISTORY_SOURCES)
+# Scatter points kept in a stored figure; lines, band and range markers are kept whole.
+FIGURE_MAX_POINTS = 2000
+
+
+@dataclass(frozen=True)
+class StoredRun:
+    result: AnalysisResult
+    stats: FitStatistics
+    prediction_interval_pct: float
+    in_count: int
+    out_count: int
+    figure: go.Figure
+    conformance: Optional[ConformanceCurve]
+    created_at: str
+
+
+def default_store_path() -> Path:
+    """``FLUX_RESULTS_DB`` if set, otherwise a per-user database shared by the app and CLI."""
+    configured = os.environ.get("FLUX_RESULTS_DB")
+    if configured:
+        return Path(configured)
+    return Path.home() / ".flux_bound_designer" / "results.sqlite3"
+
+
+def make_cache_key(
+    dataset_hash: str,
+    min_ele_flow: float,
+    max_ele_flow: float,
+    prediction_interval_pct: float,
+    engine: str = "exact",
+    conformance_target: Optional[float] = None,
+) -> str:
+    return json.dumps(
+        [dataset_hash, float(min_ele_flow), float(max_ele_flow), float(prediction_interval_pct), engine, conformance_target]
+    )
+
+
+def _pack(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+def _unpack(blob: bytes) -> str:
+    return zlib.decompress(blob).decode("utf-8")
+
+
+def _pack_conformance(curve: Optional[ConformanceCurve]) -> Optional[bytes]:
+    if curve is None:
+        return None
+    payload = {key: value for key, value in asdict(curve).items() if key not in ("x", "probability")}
+    payload["x"] = curve.x.tolist()
+    payload["probability"] = curve.probability.tolist()
+    return _pack(json.dumps(payload))
+
+
+def _unpack_conformance(blob: Optional[bytes]) -> Optional[ConformanceCurve]:
+    if blob is None:
+        return None
+    payload = json.loads(_unpack(blob))
+    payload["x"] = np.asarray(payload["x"], dtype=float)
+    payload["probability"] = np.asarray(payload["probability"], dtype=float)
+    return ConformanceCurve(**payload)
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    # Smallest string above every string starting with ``prefix`` (code point order = UTF-8 byte order).
+    while prefix and prefix[-1] == chr(0x10FFFF):
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+
+class ResultStore:
+    """SQLite-backed store of past analyses, keyed by dataset hash, limits, level and engine.
+
+    Each distinct analysis is stored once in ``analysis_results``; every run, including
+    runs served from that cache, adds a row to ``analysis_history`` with its own lot and
+    time. Connections are opened per call, so one store can be shared across threads.
+    """
+
+    def __init__(self, path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get(self, cache_key: str) -> Optional[StoredRun]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM analysis_results WHERE cache_key = ?", (cache_key,)).fetchone()
+        if row is None:
+            return None
+        return StoredRun(
+            result=AnalysisResult(
+                slope=row["slope"],
+                intercept=row["intercept"],
+                r_squared=_nan_if_none(row["r_squared"]),
+                min_intersection=_nan_if_none(row["min_intersection"]),
+                max_intersection=_nan_if_none(row["max_intersection"]),
+            ),
+            stats=FitStatistics(
+                n=row["n"],
+                slope=row["slope"],
+                intercept=row["intercept"],
+                x_mean=row["x_mean"],
+                sxx=row["sxx"],
+                residual_std=row["residual_std"],
+                r_squared=_nan_if_none(row["r_squared"]),
+            ),
+            prediction_interval_pct=row["prediction_interval_pct"],
+            in_count=row["in_count"],
+            out_count=row["out_count"],
+            figure=pio.from_json(_unpack(row["figure"])),
+            conformance=_unpack_conformance(row["conformance"]),
+            created_at=row["created_at"],
+        )
+
+    def put(
+        self,
+        cache_key: str,
+        dataset_hash: str,
+        min_ele_flow: float,
+        max_ele_flow: float,
+        prediction_interval_pct: float,
+        engine: str,
+        result: AnalysisResult,
+        stats: FitStatistics,
+        in_count: int,
+        out_count: int,
+        figure: go.Figure,
+        conformance: Optional[ConformanceCurve] = None,
+        conformance_target: Optional[float] = None,
+        lot: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+    ) -> None:
+        """Save a computed analysis under ``cache_key`` and record the run in the history."""
+        created = (created_at or datetime.now()).isoformat(timespec="seconds")
+        values = {
+            "cache_key": cache_key,
+            "dataset_hash": dataset_hash,
+            "created_at": created,
+            "min_ele_flow": float(min_ele_flow),
+            "max_ele_flow": float(max_ele_flow),
+            "prediction_interval_pct": float(prediction_interval_pct),
+            "engine": engine,
+            "conformance_target": conformance_target,
+            "slope": result.slope,
+            "intercept": result.intercept,
+            "r_squared": _none_if_nan(result.r_squared),
+            "min_intersection": _none_if_nan(result.min_intersection),
+            "max_intersection": _none_if_nan(result.max_intersection),
+            "n": stats.n,
+            "x_mean": stats.x_mean,
+            "sxx": stats.sxx,
+            "residual_std": stats.residual_std,
+            "in_count": int(in_count),
+            "out_count": int(out_count),
+            "conformance": _pack_conformance(conformance),
+            "figure": _pack(thin_scatter_points(figure, FIGURE_MAX_POINTS).to_json()),
+        }
+        columns = ", ".join(values)
+        placeholders = ", ".join(f":{name}" for name in values)
+        # Upsert keeps the row id stable, so history rows of earlier runs stay attached.
+        updates = ", ".join(f"{name} = excluded.{name}" for name in values if name != "cache_key")
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"INSERT INTO analysis_results ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT (cache_key) DO UPDATE SET {updates}",
+                values,
+            )
+            self._insert_history(conn, cache_key, lot, created, cached=False)
+
+    def record_run(self, cache_key: str, lot: Optional[str] = None, created_at: Optional[datetime] = None) -> bool:
+        """Add a history row for a run served from the stored result; False if ``cache_key`` is unknown."""
+        created = (created_at or datetime.now()).isoformat(timespec="seconds")
+        with closing(self._connect()) as conn, conn:
+            return self._insert_history(conn, cache_key, lot, created, cached=True)
+
+    @staticmethod
+    def _insert_history(conn: sqlite3.Connection, cache_key: str, lot: Optional[str], created: str, cached: bool) -> bool:
+        cursor = conn.execute(
+            "INSERT INTO analysis_history (result_id, lot, created_at, cached) "
+            "SELECT id, ?, ?, ? FROM analysis_results WHERE cache_key = ?",
+            (lot or None, created, int(cached), cache_key),
+        )
+        return cursor.rowcount == 1
+
+    def history(
+        self,
+        lot: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_ele_flow_range: Optional[tuple[float, float]] = None,
+        max_ele_flow_range: Optional[tuple[float, float]] = None,
+        prediction_interval_pct: Optional[float] = None,
+        limit: int = 1000,
+    ) -> pd.DataFrame:
+        """Past runs newest first, without figure payloads. ``lot`` matches as a prefix."""
+        query, params = self._history_query(
+            lot, since, until, min_ele_flow_range, max_ele_flow_range, prediction_interval_pct, limit
+        )
+        with closing(self._connect()) as conn:
+            runs = pd.read_sql_query(query, conn, params=params)
+        runs["cached"] = runs["cached"].astype(bool)
+        return runs
+
+    @staticmethod
+    def _history_query(
+        lot: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_ele_flow_range: Optional[tuple[float, float]] = None,
+        max_ele_flow_range: Optional[tuple[float, float]] = None,
+        prediction_interval_pct: Optional[float] = None,
+        limit: int = 1000,
+    ) -> tuple[str, list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if lot:
+            # A range on the raw column (unlike LIKE) can use idx_history_lot.
+            clauses.append("h.lot >= ?")
+            params.append(lot)
+            upper = _prefix_upper_bound(lot)
+            if upper is not None:
+                clauses.append("h.lot < ?")
+                params.append(upper)
+        if since is not None:
+            clauses.append("h.created_at >= ?")
+            params.append(since.isoformat(timespec="seconds"))
+        if until is not None:
+            clauses.append("h.created_at <= ?")
+            params.append(until.isoformat(timespec="seconds"))
+        for column, bounds in (("min_ele_flow", min_ele_flow_range), ("max_ele_flow", max_ele_flow_range)):
+            if bounds is not None:
+                clauses.append(f"r.{column} BETWEEN ? AND ?")
+                params.extend(float(v) for v in bounds)
+        if prediction_interval_pct is not None:
+            clauses.append("r.prediction_interval_pct = ?")
+            params.append(float(prediction_interval_pct))
+
+        select = ", ".join(f"{source} AS {name}" for name, source in _HISTORY_SOURCES.items())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = (
+            f"SELECT {select} FROM analysis_history h JOIN analysis_results r ON r.id = h.result_id "
+            f"{where} ORDER BY h.created_at DESC, h.id DESC LIMIT ?"
+        )
+        return query, [*params, int(limit)]
+
+
+def _none_if_nan(value: float) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else float(value)
+
+
+def _nan_if_none(value: Optional[float]) -> float:
+    return float("nan") if value is None else float(value)
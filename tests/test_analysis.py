@@ -1,9 +1,29 @@
+import json
 import math
 
+import numpy as np
 import pandas as pd
 import pytest
+import statsmodels.api as sm
 
-from src.analysis import analyze_dataframe, build_figure, validate_dataframe
+from src.analysis import (
+    AnalysisResult,
+    analyze_dataframe,
+    analyze_fit,
+    build_figure,
+    compute_fit_statistics,
+    conformance_curve,
+    conformance_probability,
+    detect_table_format,
+    load_and_validate_csv,
+    load_and_validate_table,
+    prediction_bounds,
+    read_table,
+    sample_preview,
+    solve_interval_intersections,
+    summarize_table,
+    validate_dataframe,
+)
 
 
 def make_valid_df() -> pd.DataFrame:
@@ -46,9 +66,101 @@ def test_validate_dataframe_non_numeric() -> None:
         validate_dataframe(df)
 
 
+def write_wide_csv(path) -> None:
+    df = make_valid_df()
+    df.insert(0, "Lot", ["A", "B", "C", "D", "E"])
+    df["Memo"] = "x"
+    df.to_csv(path, index=False, encoding="utf-8-sig")
+
+
+@pytest.mark.parametrize("engine", ["auto", "c", "pyarrow"])
+def test_load_and_validate_csv_reads_only_required_columns(tmp_path, engine: str) -> None:
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / "wide.csv"
+    write_wide_csv(path)
+    out = load_and_validate_csv(str(path), encoding="utf-8-sig", engine=engine)
+    assert list(out.columns) == ["F.S.Flux", "Ele.Flow"]
+    pd.testing.assert_frame_equal(out, make_valid_df())
+
+
+def test_read_table_c_engine_pushes_down_float_dtype(tmp_path) -> None:
+    path = tmp_path / "ints.csv"
+    pd.DataFrame({"F.S.Flux": [1, 2, 3], "Ele.Flow": [10, 20, 30]}).to_csv(path, index=False)
+    out = read_table(str(path), engine="c")
+    assert list(out.dtypes) == ["float64", "float64"]
+
+
+def test_read_table_explicit_pyarrow_does_not_fall_back(tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "missing.csv"
+    pd.DataFrame({"F.S.Flux": [1.0, 2.0, 3.0]}).to_csv(path, index=False)
+    with pytest.raises(KeyError):
+        read_table(str(path), engine="pyarrow")
+
+
+def test_read_table_pyarrow_falls_back_for_missing_column(tmp_path) -> None:
+    path = tmp_path / "missing.csv"
+    pd.DataFrame({"F.S.Flux": [1.0, 2.0, 3.0]}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match="Missing required columns"):
+        load_and_validate_csv(str(path))
+
+
+def test_read_table_pyarrow_falls_back_for_non_numeric(tmp_path) -> None:
+    path = tmp_path / "text.csv"
+    pd.DataFrame({"F.S.Flux": [1.0, 2.0, 3.0], "Ele.Flow": [10.0, "x", 30.0]}).to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        load_and_validate_csv(str(path))
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+def test_load_and_validate_table_columnar(tmp_path, suffix: str) -> None:
+    pytest.importorskip("pyarrow")
+    path = tmp_path / f"data{suffix}"
+    df = make_valid_df()
+    df["Lot"] = ["A", "B", "C", "D", "E"]
+    if suffix == ".parquet":
+        df.to_parquet(path)
+    else:
+        df.to_feather(path)
+    out = load_and_validate_table(str(path))
+    pd.testing.assert_frame_equal(out, make_valid_df())
+
+
+def test_read_table_rejects_unknown_options() -> None:
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        detect_table_format("data.xlsx")
+    with pytest.raises(ValueError, match="engine"):
+        read_table("data.csv", engine="python")
+
+
+def test_summarize_table_counts_invalid_rows() -> None:
+    df = pd.DataFrame(
+        {
+            "F.S.Flux": [1.0, 2.0, None, 4.0, 5.0],
+            "Ele.Flow": [10.0, "x", 30.0, 40.0, 50.0],
+        }
+    )
+    summary = summarize_table(df)
+    assert summary.row_count == 5
+    assert summary.invalid_row_count == 2
+    assert summary.stats.loc["min", "F.S.Flux"] == 1.0
+    assert summary.stats.loc["max", "Ele.Flow"] == 50.0
+    assert math.isclose(summary.stats.loc["mean", "Ele.Flow"], 100.0 / 3.0)
+
+
+def test_sample_preview_is_bounded_and_keeps_head() -> None:
+    df = pd.DataFrame({"F.S.Flux": range(10_000), "Ele.Flow": range(10_000)})
+    preview = sample_preview(df, max_rows=50, head_rows=5)
+    assert len(preview) == 50
+    assert list(preview.index[:5]) == [0, 1, 2, 3, 4]
+    assert preview.index.is_monotonic_increasing
+    assert len(sample_preview(make_valid_df(), max_rows=50)) == 5
+
+
 def test_analyze_dataframe_expected_values() -> None:
     df = make_valid_df()
-    result, pred_summary, fitted = analyze_dataframe(df, min_ele_flow=15.0, max_ele_flow=45.0)
+    result, pred_summary, fitted = analyze_dataframe(df, min_ele_flow=15.0, max_ele_flow=45.0, engine="polyfit")
 
     assert math.isclose(result.slope, 9.99, rel_tol=1e-8, abs_tol=1e-8)
     assert math.isclose(result.intercept, 0.41, rel_tol=1e-8, abs_tol=1e-8)
@@ -59,10 +171,97 @@ def test_analyze_dataframe_expected_values() -> None:
     assert len(fitted) == len(df)
 
 
+def test_analyze_dataframe_exact_intersections_hit_the_limits() -> None:
+    df = make_valid_df()
+    result, _, _ = analyze_dataframe(df, min_ele_flow=15.0, max_ele_flow=45.0)
+    model = sm.OLS(df["Ele.Flow"], sm.add_constant(df["F.S.Flux"])).fit()
+    x_new = np.array([[1.0, result.min_intersection], [1.0, result.max_intersection]])
+    frame = model.get_prediction(x_new).summary_frame(alpha=0.05)
+
+    assert math.isclose(frame["obs_ci_lower"].iloc[0], 15.0, rel_tol=1e-10)
+    assert math.isclose(frame["obs_ci_upper"].iloc[1], 45.0, rel_tol=1e-10)
+    # Close to, but not identical with, the straight-line approximation.
+    assert math.isclose(result.min_intersection, 1.5808252639534688, rel_tol=1e-3)
+    assert math.isclose(result.max_intersection, 4.343098659970456, rel_tol=1e-3)
+
+
+def test_analyze_dataframe_exact_skips_prediction_frame() -> None:
+    df = make_valid_df()
+    _, band, fitted = analyze_dataframe(df, min_ele_flow=15.0, max_ele_flow=45.0)
+    _, _, polyfit_fitted = analyze_dataframe(df, min_ele_flow=15.0, max_ele_flow=45.0, engine="polyfit")
+
+    assert band == compute_fit_statistics(df)
+    np.testing.assert_allclose(fitted, polyfit_fitted, rtol=1e-10)
+
+
+def test_build_figure_reuses_observation_bounds() -> None:
+    df = make_valid_df()
+    result, stats, fitted = analyze_dataframe(df, min_ele_flow=15.0, max_ele_flow=45.0)
+    everything_out = (np.full(len(df), np.inf), np.full(len(df), -np.inf))
+    fig = build_figure(df, stats, fitted, result, 15.0, 45.0, observation_bounds=everything_out)
+
+    points = {trace.name: len(trace.x) for trace in fig.data if trace.mode == "markers"}
+    assert points == {"予測区間内": 0, "予測区間外": len(df)}
+
+
+def test_analyze_fit_matches_analyze_dataframe() -> None:
+    df = make_valid_df()
+    expected, _, _ = analyze_dataframe(df, min_ele_flow=15.0, max_ele_flow=45.0, prediction_interval_pct=90.0)
+    result = analyze_fit(compute_fit_statistics(df), 15.0, 45.0, prediction_interval_pct=90.0)
+
+    for field in ("slope", "intercept", "r_squared", "min_intersection", "max_intersection"):
+        assert math.isclose(getattr(result, field), getattr(expected, field), rel_tol=1e-9)
+
+
+def test_prediction_bounds_match_statsmodels() -> None:
+    df = make_valid_df()
+    _, pred_summary, _ = analyze_dataframe(
+        df, min_ele_flow=15.0, max_ele_flow=45.0, prediction_interval_pct=68.0, engine="polyfit"
+    )
+    lower, upper = prediction_bounds(compute_fit_statistics(df), df["F.S.Flux"], prediction_interval_pct=68.0)
+
+    np.testing.assert_allclose(lower, pred_summary["obs_ci_lower"].to_numpy(), rtol=1e-10)
+    np.testing.assert_allclose(upper, pred_summary["obs_ci_upper"].to_numpy(), rtol=1e-10)
+
+
+def test_solve_interval_intersections_negative_slope() -> None:
+    df = pd.DataFrame({"F.S.Flux": [1.0, 2.0, 3.0, 4.0, 5.0], "Ele.Flow": [50.2, 40.8, 30.1, 20.3, 10.5]})
+    stats = compute_fit_statistics(df)
+    min_x, max_x = solve_interval_intersections(stats, 15.0, 45.0)
+    lower, upper = prediction_bounds(stats, [min_x, max_x])
+
+    assert max_x < min_x
+    assert math.isclose(lower[0], 15.0, rel_tol=1e-10)
+    assert math.isclose(upper[1], 45.0, rel_tol=1e-10)
+
+
+def test_solve_interval_intersections_unreachable_limit() -> None:
+    # Flat, noisy data: the lower bound never climbs to the limit.
+    df = pd.DataFrame({"F.S.Flux": [1.0, 2.0, 3.0, 4.0, 5.0], "Ele.Flow": [10.0, 12.0, 9.0, 11.0, 10.0]})
+    stats = compute_fit_statistics(df)
+    min_x, max_x = solve_interval_intersections(stats, 20.0, 30.0)
+    assert math.isnan(min_x)
+    # The convex upper bound still reaches its limit far outside the data.
+    assert math.isclose(prediction_bounds(stats, [max_x])[1][0], 30.0, rel_tol=1e-10)
+
+
+def test_build_figure_from_fit_statistics() -> None:
+    df = make_valid_df()
+    stats = compute_fit_statistics(df)
+    result = analyze_fit(stats, 15.0, 45.0)
+    fig = build_figure(df, None, None, result, 15.0, 45.0, stats=stats)
+
+    trace_names = [trace.name for trace in fig.data if trace.name]
+    assert "95% 予測区間" in trace_names
+    assert "平膜Flux範囲" in trace_names
+    with pytest.raises(ValueError, match="pred_summary or stats"):
+        build_figure(df, None, None, result, 15.0, 45.0)
+
+
 def test_analyze_dataframe_prediction_interval_width_changes() -> None:
     df = make_valid_df()
-    _, pred_68, _ = analyze_dataframe(df, min_ele_flow=15.0, max_ele_flow=45.0, prediction_interval_pct=68.0)
-    _, pred_997, _ = analyze_dataframe(df, min_ele_flow=15.0, max_ele_flow=45.0, prediction_interval_pct=99.7)
+    _, pred_68, _ = analyze_dataframe(df, 15.0, 45.0, prediction_interval_pct=68.0, engine="polyfit")
+    _, pred_997, _ = analyze_dataframe(df, 15.0, 45.0, prediction_interval_pct=99.7, engine="polyfit")
 
     width_68 = (pred_68["obs_ci_upper"] - pred_68["obs_ci_lower"]).mean()
     width_997 = (pred_997["obs_ci_upper"] - pred_997["obs_ci_lower"]).mean()
@@ -78,7 +277,9 @@ def test_analyze_dataframe_prediction_interval_pct_out_of_range(pct: float) -> N
 
 def test_build_figure_uses_simulation_aligned_styles() -> None:
     df = make_valid_df()
-    result, pred_summary, fitted = analyze_dataframe(df, min_ele_flow=15.0, max_ele_flow=45.0, prediction_interval_pct=95.0)
+    result, pred_summary, fitted = analyze_dataframe(
+        df, min_ele_flow=15.0, max_ele_flow=45.0, prediction_interval_pct=95.0, engine="polyfit"
+    )
     fig = build_figure(
         df,
         pred_summary,
@@ -114,3 +315,82 @@ def test_build_figure_uses_simulation_aligned_styles() -> None:
     assert "上限" in annotation_texts
     assert "下限" in annotation_texts
     assert any(text.startswith("範囲:") for text in annotation_texts if text)
+
+
+def test_compute_fit_statistics_matches_statsmodels() -> None:
+    df = make_valid_df()
+    stats = compute_fit_statistics(df)
+    model = sm.OLS(df["Ele.Flow"], sm.add_constant(df["F.S.Flux"])).fit()
+
+    assert stats.n == 5
+    assert math.isclose(stats.slope, model.params["F.S.Flux"], rel_tol=1e-10)
+    assert math.isclose(stats.intercept, model.params["const"], rel_tol=1e-10)
+    assert math.isclose(stats.residual_std, math.sqrt(model.scale), rel_tol=1e-10)
+
+
+def test_conformance_probability_matches_prediction_interval() -> None:
+    # With the limits set to the 90% prediction bounds at x0, P(within limits) at x0 is exactly 90%.
+    df = make_valid_df()
+    stats = compute_fit_statistics(df)
+    model = sm.OLS(df["Ele.Flow"], sm.add_constant(df["F.S.Flux"])).fit()
+    x0 = np.array([[1.0, 2.7]])
+    frame = model.get_prediction(x0).summary_frame(alpha=0.10)
+
+    probability = conformance_probability(
+        stats, [2.7], float(frame["obs_ci_lower"].iloc[0]), float(frame["obs_ci_upper"].iloc[0])
+    )
+    assert probability.shape == (1,)
+    assert math.isclose(float(probability[0]), 0.90, rel_tol=1e-9)
+
+
+def test_conformance_curve_vectorized_over_many_candidates() -> None:
+    stats = compute_fit_statistics(make_valid_df())
+    x = np.linspace(0.0, 6.0, 1_000_000)
+    curve = conformance_curve(stats, x, min_ele_flow=15.0, max_ele_flow=45.0, target_probability=0.95)
+
+    assert curve.probability.shape == x.shape
+    assert np.all((curve.probability >= 0.0) & (curve.probability <= 1.0))
+    assert math.isclose(curve.best_x, 2.9629, abs_tol=0.05)
+    assert curve.best_probability > 0.99
+    assert curve.target_min < curve.best_x < curve.target_max
+    assert np.all(conformance_probability(stats, [curve.target_min, curve.target_max], 15.0, 45.0) >= 0.95)
+
+
+def test_conformance_curve_without_feasible_range() -> None:
+    stats = compute_fit_statistics(make_valid_df())
+    curve = conformance_curve(stats, np.linspace(0.0, 6.0, 100), min_ele_flow=30.0, max_ele_flow=30.5)
+    assert math.isnan(curve.target_min)
+    assert math.isnan(curve.target_max)
+    with pytest.raises(ValueError, match="target_probability"):
+        conformance_curve(stats, [1.0], min_ele_flow=15.0, max_ele_flow=45.0, target_probability=1.0)
+
+
+def test_build_figure_conformance_overlay() -> None:
+    df = make_valid_df()
+    result, stats, fitted = analyze_dataframe(df, min_ele_flow=15.0, max_ele_flow=45.0)
+    curve = conformance_curve(stats, np.linspace(0.0, 6.0, 50), 15.0, 45.0)
+    fig = build_figure(df, stats, fitted, result, 15.0, 45.0, conformance=curve)
+
+    overlay = [trace for trace in fig.data if trace.name == "適合確率"]
+    assert len(overlay) == 1
+    assert overlay[0].yaxis == "y2"
+    assert fig.layout.yaxis2.overlaying == "y"
+    assert fig.layout.yaxis2.range == (0.0, 1.05)
+    assert fig.layout.yaxis2.tickformat == ".0%"
+    assert fig.layout.yaxis.tickformat == ",.0f"
+
+
+def test_analysis_result_json_dict_uses_null_for_missing_range() -> None:
+    result = AnalysisResult(
+        slope=1.0, intercept=0.0, r_squared=float("nan"), min_intersection=float("nan"), max_intersection=2.0
+    )
+
+    assert not result.has_range
+    assert result.to_json_dict() == {
+        "slope": 1.0,
+        "intercept": 0.0,
+        "r_squared": None,
+        "min_intersection": None,
+        "max_intersection": 2.0,
+    }
+    json.dumps(result.to_json_dict(), allow_nan=False)
@@ -0,0 +1,38 @@
+import json
+
+import run_analysis_cli
+
+
+CSV_TEXT = "F.S.Flux,Ele.Flow\n1.0,10.5\n2.0,20.3\n3.0,30.1\n4.0,40.8\n5.0,50.2\n"
+
+
+def test_analyze_then_history(tmp_path, capsys) -> None:
+    data = tmp_path / "data.csv"
+    data.write_text(CSV_TEXT, encoding="utf-8")
+    db = str(tmp_path / "results.sqlite3")
+    analyze = ["--db", db, "analyze", str(data), "--min-ele-flow", "15", "--max-ele-flow", "45"]
+
+    assert run_analysis_cli.main([*analyze, "--lot", "LOT-1"]) == 0
+    first = json.loads(capsys.readouterr().out)
+    assert not first["cached"]
+    assert first["in_count"] + first["out_count"] == 5
+
+    assert run_analysis_cli.main([*analyze, "--lot", "LOT-2"]) == 0
+    assert json.loads(capsys.readouterr().out)["cached"]
+
+    assert run_analysis_cli.main(["--db", db, "history", "--lot", "LOT-"]) == 0
+    out = capsys.readouterr().out
+    assert "LOT-1" in out and "LOT-2" in out
+
+
+def test_analyze_reports_bad_input_without_traceback(tmp_path, capsys) -> None:
+    bad = tmp_path / "bad.csv"
+    bad.write_text("F.S.Flux\n1.0\n2.0\n3.0\n", encoding="utf-8")
+    db = str(tmp_path / "results.sqlite3")
+
+    assert run_analysis_cli.main(["--db", db, "analyze", str(bad), "--min-ele-flow", "15", "--max-ele-flow", "45"]) == 1
+    assert "Missing required columns" in capsys.readouterr().err
+
+    missing = str(tmp_path / "missing.csv")
+    assert run_analysis_cli.main(["--db", db, "analyze", missing, "--min-ele-flow", "15", "--max-ele-flow", "45"]) == 1
+    assert "Analysis failed" in capsys.readouterr().err
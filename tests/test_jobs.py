@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from src.jobs import AnalysisJobRunner, JobCancelled
+
+
+def wait_for(job, timeout: float = 5.0) -> None:
+    job._future.exception(timeout=timeout)
+
+
+def test_submit_runs_in_background_and_reports_progress() -> None:
+    runner = AnalysisJobRunner(max_workers=1)
+
+    def work(x: int, progress) -> int:
+        progress(50, "half")
+        return x * 2
+
+    job = runner.submit("a", work, 21)
+    wait_for(job)
+    assert job.done()
+    assert not job.failed()
+    assert job.result() == 42
+    assert job.progress == 50
+    assert job.message == "half"
+
+
+def test_submit_deduplicates_identical_in_flight_jobs() -> None:
+    runner = AnalysisJobRunner(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def work(progress) -> str:
+        calls.append(1)
+        release.wait(5.0)
+        return "ok"
+
+    first = runner.submit("same", work)
+    second = runner.submit("same", work)
+    release.set()
+    wait_for(first)
+    assert first is second
+    assert len(calls) == 1
+
+
+def test_cancel_stale_stops_job_at_next_progress_report() -> None:
+    runner = AnalysisJobRunner(max_workers=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def work(progress) -> str:
+        started.set()
+        release.wait(5.0)
+        progress(50, "after cancel")
+        return "unreachable"
+
+    job = runner.submit("old", work)
+    started.wait(5.0)
+    assert runner.cancel_stale("new") == 1
+    release.set()
+    wait_for(job)
+
+    assert job.cancelled
+    assert isinstance(job.error(), JobCancelled)
+    assert runner.get("old") is None
+
+
+def test_failed_job_is_resubmitted() -> None:
+    runner = AnalysisJobRunner(max_workers=1)
+    attempts = []
+
+    def work(progress) -> str:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("boom")
+        return "ok"
+
+    failed = runner.submit("k", work)
+    wait_for(failed)
+    assert isinstance(failed.error(), ValueError)
+    with pytest.raises(ValueError, match="boom"):
+        failed.result()
+
+    retried = runner.submit("k", work)
+    wait_for(retried)
+    assert retried is not failed
+    assert retried.result() == "ok"
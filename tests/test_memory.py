@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.memory import SessionMemoryManager, estimate_nbytes
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"F.S.Flux": np.arange(rows, dtype=float), "Ele.Flow": np.arange(rows, dtype=float)})
+
+
+def test_estimate_nbytes_counts_nested_buffers() -> None:
+    df = make_frame(1000)
+    assert estimate_nbytes(df) >= 16_000
+    assert estimate_nbytes(("key", df)) > estimate_nbytes(df)
+    assert estimate_nbytes(b"x" * 500) == 500
+
+
+def test_session_cap_spills_least_recently_used(tmp_path) -> None:
+    frame_bytes = estimate_nbytes(make_frame(1000))
+    memory = SessionMemoryManager(session_cap_bytes=int(frame_bytes * 2.5), global_cap_bytes=10**9, spill_dir=tmp_path)
+
+    memory.put("s1", "a", make_frame(1000))
+    memory.put("s1", "b", make_frame(1000))
+    memory.get("s1", "a")
+    memory.put("s1", "c", make_frame(1000))
+
+    usage = memory.usage().set_index("session")
+    assert usage.loc["s1", "artifacts"] == 3
+    assert usage.loc["s1", "spilled_bytes"] == frame_bytes
+    assert memory.memory_bytes("s1") <= memory.session_cap_bytes
+    assert len(list(memory.spill_dir.iterdir())) == 1
+
+    # "b" was least recently used; reading it back reloads it from disk.
+    pd.testing.assert_frame_equal(memory.get("s1", "b"), make_frame(1000))
+
+
+def test_global_cap_evicts_across_sessions(tmp_path) -> None:
+    frame_bytes = estimate_nbytes(make_frame(1000))
+    memory = SessionMemoryManager(session_cap_bytes=10**9, global_cap_bytes=int(frame_bytes * 1.5), spill_dir=tmp_path)
+
+    memory.put("old", "preview", make_frame(1000))
+    memory.put("new", "preview", make_frame(1000))
+
+    assert memory.memory_bytes("old") == 0
+    assert memory.memory_bytes("new") == frame_bytes
+
+    memory.drop_session("old")
+    assert list(memory.spill_dir.iterdir()) == []
+    assert memory.get("old", "preview") is None
+
+
+def test_oversize_artifact_is_not_respilled_on_get(tmp_path) -> None:
+    memory = SessionMemoryManager(session_cap_bytes=1000, global_cap_bytes=10**9, spill_dir=tmp_path)
+    memory.put("s1", "big", make_frame(1000))
+    spilled = list(memory.spill_dir.iterdir())
+    assert len(spilled) == 1
+    mtime = spilled[0].stat().st_mtime_ns
+
+    for _ in range(3):
+        pd.testing.assert_frame_equal(memory.get("s1", "big"), make_frame(1000))
+
+    assert list(memory.spill_dir.iterdir()) == spilled
+    assert spilled[0].stat().st_mtime_ns == mtime
+    assert memory.memory_bytes("s1") == 0
+
+
+def test_reap_sessions_by_liveness_and_idle_time(tmp_path) -> None:
+    memory = SessionMemoryManager(session_cap_bytes=1, global_cap_bytes=10**9, spill_dir=tmp_path)
+    memory.put("gone", "preview", make_frame(10))
+    memory.put("alive", "preview", make_frame(10))
+    memory.record_upload("alive", 1234)
+
+    assert memory.reap_sessions(is_alive=lambda session_id: session_id != "gone") == ["gone"]
+    assert memory.sessions() == ["alive"]
+    assert len(list(memory.spill_dir.iterdir())) == 1
+    assert memory.usage().loc[0, "upload_bytes"] == 1234
+
+    assert memory.reap_sessions(max_idle_seconds=-1.0) == ["alive"]
+    assert memory.usage().empty
+
+
+def test_close_removes_spill_directory(tmp_path) -> None:
+    memory = SessionMemoryManager(session_cap_bytes=1, global_cap_bytes=10**9, spill_dir=tmp_path)
+    memory.put("s1", "preview", make_frame(10))
+    memory.close()
+    assert not memory.spill_dir.exists()
+    assert tmp_path.exists()
+
+
+def test_unpicklable_artifacts_are_dropped(tmp_path) -> None:
+    memory = SessionMemoryManager(session_cap_bytes=1, global_cap_bytes=10**9, spill_dir=tmp_path)
+    memory.put("s1", "callback", lambda: None)
+    assert memory.get("s1", "callback") is None
+
+
+def test_caps_must_be_positive() -> None:
+    with pytest.raises(ValueError, match="positive"):
+        SessionMemoryManager(session_cap_bytes=0, global_cap_bytes=1)
@@ -0,0 +1,57 @@
+import pytest
+
+from src.pipeline import dataset_fingerprint, run_analysis_pipeline
+
+
+CSV_BYTES = "F.S.Flux,Ele.Flow\n1.0,10.5\n2.0,20.3\n3.0,30.1\n4.0,40.8\n5.0,50.2\n".encode("utf-8-sig")
+
+
+def test_run_analysis_pipeline_reports_all_stages() -> None:
+    stages = []
+    output = run_analysis_pipeline(
+        CSV_BYTES,
+        "data.csv",
+        min_ele_flow=15.0,
+        max_ele_flow=45.0,
+        progress=lambda value, message: stages.append(value),
+    )
+
+    assert stages == [0, 20, 40, 65, 85, 100]
+    assert output.in_count + output.out_count == 5
+    assert output.prediction_interval_pct == 95.0
+    assert output.result.min_intersection < output.result.max_intersection
+    assert any(trace.name == "平膜Flux範囲" for trace in output.figure.data)
+
+
+def test_run_analysis_pipeline_conformance_overlay() -> None:
+    output = run_analysis_pipeline(CSV_BYTES, "data.csv", min_ele_flow=15.0, max_ele_flow=45.0, conformance_target=0.9)
+
+    assert output.conformance is not None
+    assert output.conformance.target_probability == 0.9
+    assert any(trace.name == "適合確率" for trace in output.figure.data)
+    assert run_analysis_pipeline(CSV_BYTES, "data.csv", min_ele_flow=15.0, max_ele_flow=45.0).conformance is None
+
+
+def test_run_analysis_pipeline_progress_can_abort() -> None:
+    def abort(value: int, message: str) -> None:
+        if value >= 40:
+            raise RuntimeError("stop")
+
+    with pytest.raises(RuntimeError, match="stop"):
+        run_analysis_pipeline(CSV_BYTES, "data.csv", min_ele_flow=15.0, max_ele_flow=45.0, progress=abort)
+
+
+def test_dataset_fingerprint_is_content_based() -> None:
+    assert dataset_fingerprint(CSV_BYTES) == dataset_fingerprint(bytes(CSV_BYTES))
+    assert dataset_fingerprint(CSV_BYTES) != dataset_fingerprint(CSV_BYTES + b"6.0,60.0\n")
+
+
+def test_run_analysis_pipeline_thins_scatter_points() -> None:
+    rows = "".join(f"{1.0 + i / 1000},{10.0 * (1.0 + i / 1000) + (i % 7) * 0.1}\n" for i in range(5000))
+    raw = f"F.S.Flux,Ele.Flow\n{rows}".encode("utf-8")
+    output = run_analysis_pipeline(raw, "big.csv", min_ele_flow=15.0, max_ele_flow=45.0, figure_max_points=500)
+
+    markers = [trace for trace in output.figure.data if trace.mode == "markers"]
+    assert sum(len(trace.x) for trace in markers) <= 502
+    assert output.in_count + output.out_count == 5000
+    assert len(next(trace for trace in output.figure.data if trace.name == "回帰直線").x) == 200
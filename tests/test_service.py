@@ -0,0 +1,116 @@
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from src.service import AnalysisService, analyze_payload, make_server
+
+
+PARAMS = {"min_ele_flow": "15.0", "max_ele_flow": "45.0"}
+DATA = {"F.S.Flux": [1.0, 2.0, 3.0, 4.0, 5.0], "Ele.Flow": [10.5, 20.3, 30.1, 40.8, 50.2]}
+
+
+def test_analyze_payload_formats_agree() -> None:
+    pytest.importorskip("pyarrow")
+    csv_bytes = pd.DataFrame(DATA).to_csv(index=False).encode("utf-8")
+    feather = io.BytesIO()
+    pd.DataFrame(DATA).to_feather(feather)
+    json_bytes = json.dumps({"data": DATA, "min_ele_flow": 15.0, "max_ele_flow": 45.0}).encode("utf-8")
+
+    from_csv = analyze_payload(csv_bytes, "csv", PARAMS)
+    from_arrow = analyze_payload(feather.getvalue(), "feather", PARAMS)
+    from_json = analyze_payload(json_bytes, "json", {})
+
+    assert from_csv["slope"] == pytest.approx(9.99)
+    assert from_arrow == pytest.approx(from_csv)
+    assert from_json == pytest.approx(from_csv)
+
+
+def test_analyze_payload_rejects_bad_limits() -> None:
+    with pytest.raises(ValueError, match="min_ele_flow"):
+        analyze_payload(json.dumps({"data": DATA}).encode("utf-8"), "json", {"min_ele_flow": 45, "max_ele_flow": 15})
+
+
+@pytest.mark.parametrize("value", [None, [15.0], {"v": 1}, True, "abc", "nan", "inf", "-Infinity"])
+def test_analyze_payload_rejects_non_numeric_params(value) -> None:
+    body = json.dumps({"data": DATA, "min_ele_flow": value, "max_ele_flow": 45.0}).encode("utf-8")
+    with pytest.raises(ValueError, match="min_ele_flow must be a (finite )?number"):
+        analyze_payload(body, "json", {})
+
+
+@pytest.fixture()
+def server_url():
+    service = AnalysisService(workers=2, executor=ThreadPoolExecutor(max_workers=2))
+    server = make_server("127.0.0.1", 0, service, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    service.shutdown()
+
+
+def post_json(url: str, body: dict) -> tuple[int, dict]:
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"}, method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_http_single_and_batch_endpoints(server_url: str) -> None:
+    status, body = post_json(f"{server_url}/analyze?min_ele_flow=15&max_ele_flow=45", {"data": DATA})
+    assert status == 200
+    assert body["result"]["slope"] == pytest.approx(9.99)
+
+    status, body = post_json(
+        f"{server_url}/analyze/batch?min_ele_flow=15&max_ele_flow=45",
+        {
+            "items": [
+                {"data": DATA},
+                {"data": {"F.S.Flux": [1.0]}},
+                {"data": DATA, "min_ele_flow": None},
+                {"csv": 5},
+                {"data": DATA, "max_ele_flow": "nan"},
+            ]
+        },
+    )
+    assert status == 200
+    assert body["results"][0]["result"]["intercept"] == pytest.approx(0.41)
+    assert "Missing required columns" in body["results"][1]["error"]
+    assert "must be a number" in body["results"][2]["error"]
+    assert "'csv' must be a string" in body["results"][3]["error"]
+    assert "must be a finite number" in body["results"][4]["error"]
+
+
+def test_http_reports_client_errors(server_url: str) -> None:
+    status, body = post_json(f"{server_url}/analyze", {"data": DATA})
+    assert status == 400
+    assert "Missing analysis parameters" in body["error"]
+
+
+def test_http_unreachable_limit_is_json_null(server_url: str) -> None:
+    flat = {"F.S.Flux": [1.0, 2.0, 3.0, 4.0, 5.0], "Ele.Flow": [10.0, 12.0, 9.0, 11.0, 10.0]}
+    request = urllib.request.Request(
+        f"{server_url}/analyze?min_ele_flow=20&max_ele_flow=30",
+        data=json.dumps({"data": flat}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request) as response:
+        raw = response.read().decode("utf-8")
+
+    def reject_constant(name: str):
+        raise AssertionError(f"invalid JSON constant {name}")
+
+    body = json.loads(raw, parse_constant=reject_constant)
+    assert body["result"]["min_intersection"] is None
+    assert body["result"]["max_intersection"] is not None
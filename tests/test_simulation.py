@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.simulation import (
+    SimulationSpec,
+    format_verification_report,
+    generate_dataset,
+    in_interval_counts,
+    quantile_residuals,
+    search_seeds,
+)
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_generate_dataset_reproduces_shipped_csv() -> None:
+    shipped = pd.read_csv(ROOT / "simulation_data_perfect.csv")
+    generated = generate_dataset(SimulationSpec(), seed=634)
+
+    np.testing.assert_allclose(generated["x"], shipped["x"], rtol=1e-12)
+    np.testing.assert_allclose(generated["y"], shipped["y"], rtol=1e-12)
+
+
+def test_residuals_are_a_permutation_of_normal_quantiles() -> None:
+    spec = SimulationSpec(n_points=40)
+    df = generate_dataset(spec, seed=7)
+    x = df["x"].to_numpy()
+    z = (df["y"].to_numpy() - spec.slope * x - spec.intercept) / spec.pred_sigma(x)
+    np.testing.assert_allclose(np.sort(z), quantile_residuals(40), atol=1e-12)
+
+
+def test_in_interval_counts_batched_matches_single_seed() -> None:
+    spec = SimulationSpec()
+    batched = in_interval_counts(spec, [1, 634, 9])
+    assert batched.shape == (3, len(spec.levels))
+    np.testing.assert_array_equal(batched[1], in_interval_counts(spec, [634])[0])
+    assert batched[1, spec.levels.index(60)] == 60
+
+
+def test_search_seeds_parallel_matches_serial() -> None:
+    spec = SimulationSpec()
+    serial = search_seeds(spec, range(300), workers=1)
+    parallel = search_seeds(spec, range(300), workers=2, batch_size=100)
+
+    assert serial.best_seed == parallel.best_seed
+    np.testing.assert_array_equal(serial.exact_matches, parallel.exact_matches)
+    assert serial.exact_matches.max() == serial.exact_matches[serial.seeds == serial.best_seed][0]
+    with pytest.raises(ValueError, match="seeds"):
+        search_seeds(spec, [])
+
+
+def test_format_verification_report() -> None:
+    spec = SimulationSpec(levels=(50, 51, 99))
+    report = format_verification_report(spec, 634, np.array([50, 52, 100]))
+
+    assert "シード: 634" in report
+    assert "完全一致: 1/3" in report
+    assert "最大誤差: ±1" in report
+    assert "  50%: 50点 ✓" in report
+    assert "  51%: 52点 (+1)" in report
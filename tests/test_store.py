@@ -0,0 +1,164 @@
+import base64
+import math
+import sqlite3
+from dataclasses import replace
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.pipeline as pipeline
+from src.analysis import conformance_curve
+from src.pipeline import dataset_fingerprint, run_analysis_pipeline
+from src.store import FIGURE_MAX_POINTS, ResultStore, make_cache_key
+
+
+CSV_BYTES = "F.S.Flux,Ele.Flow\n1.0,10.5\n2.0,20.3\n3.0,30.1\n4.0,40.8\n5.0,50.2\n".encode("utf-8-sig")
+
+
+def put_run(store: ResultStore, dataset_hash: str, min_ele_flow: float, lot: str, created_at: datetime) -> None:
+    output = run_analysis_pipeline(CSV_BYTES, "data.csv", min_ele_flow=min_ele_flow, max_ele_flow=45.0)
+    store.put(
+        make_cache_key(dataset_hash, min_ele_flow, 45.0, 95.0),
+        dataset_hash,
+        min_ele_flow,
+        45.0,
+        95.0,
+        engine="exact",
+        result=output.result,
+        stats=output.stats,
+        in_count=output.in_count,
+        out_count=output.out_count,
+        figure=output.figure,
+        lot=lot,
+        created_at=created_at,
+    )
+
+
+def test_put_get_roundtrip(tmp_path) -> None:
+    store = ResultStore(tmp_path / "results.sqlite3")
+    output = run_analysis_pipeline(CSV_BYTES, "data.csv", min_ele_flow=15.0, max_ele_flow=45.0)
+    result, stats = output.result, output.stats
+    curve = conformance_curve(stats, np.linspace(0.0, 6.0, 25), 15.0, 45.0)
+    key = make_cache_key("abc", 15.0, 45.0, 95.0, conformance_target=0.95)
+
+    assert store.get(key) is None
+    store.put(key, "abc", 15.0, 45.0, 95.0, "exact", result, stats, 5, 0, output.figure, curve, 0.95, lot="L1")
+    stored = store.get(key)
+
+    assert stored.result == result
+    assert stored.stats == stats
+    assert list(store.history()["lot"]) == ["L1"]
+    assert len(stored.figure.data) == len(output.figure.data)
+    np.testing.assert_allclose(stored.conformance.probability, curve.probability)
+    assert stored.conformance.best_x == curve.best_x
+
+
+def test_nan_intersections_survive_roundtrip(tmp_path) -> None:
+    store = ResultStore(tmp_path / "results.sqlite3")
+    output = run_analysis_pipeline(CSV_BYTES, "data.csv", min_ele_flow=15.0, max_ele_flow=45.0)
+    result = replace(output.result, min_intersection=float("nan"))
+    store.put("k", "abc", 15.0, 45.0, 95.0, "exact", result, output.stats, 0, 5, output.figure)
+    assert math.isnan(store.get("k").result.min_intersection)
+
+
+def test_history_filters_and_uses_indexes(tmp_path) -> None:
+    store = ResultStore(tmp_path / "results.sqlite3")
+    put_run(store, "h1", 15.0, "LOT-A1", datetime(2026, 1, 10))
+    put_run(store, "h2", 16.0, "LOT-A2", datetime(2026, 2, 10))
+    put_run(store, "h3", 17.0, "LOT-B1", datetime(2026, 3, 10))
+
+    assert list(store.history()["lot"]) == ["LOT-B1", "LOT-A2", "LOT-A1"]
+    assert list(store.history(lot="LOT-A")["lot"]) == ["LOT-A2", "LOT-A1"]
+    assert list(store.history(since=datetime(2026, 2, 1))["dataset_hash"]) == ["h3", "h2"]
+    assert list(store.history(min_ele_flow_range=(15.5, 16.5))["dataset_hash"]) == ["h2"]
+    assert len(store.history(limit=1)) == 1
+
+
+@pytest.mark.parametrize(
+    "filters, index",
+    [
+        ({"lot": "LOT-A"}, "h USING INDEX idx_history_lot"),
+        ({"since": datetime(2026, 2, 1)}, "h USING INDEX idx_history_created"),
+        ({"min_ele_flow_range": (15.0, 16.0)}, "r USING INDEX idx_results_params"),
+        ({"max_ele_flow_range": (40.0, 50.0)}, "r USING INDEX idx_results_max_flow"),
+        ({"prediction_interval_pct": 95.0}, "r USING INDEX idx_results_pct"),
+    ],
+)
+def test_history_query_uses_indexes(tmp_path, filters, index) -> None:
+    store = ResultStore(tmp_path / "results.sqlite3")
+    query, params = store._history_query(**filters)
+    with sqlite3.connect(store.path) as conn:
+        plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+    assert any(f"SEARCH {index}" in step for step in plan)
+
+
+def test_lot_prefix_matches_literally(tmp_path) -> None:
+    store = ResultStore(tmp_path / "results.sqlite3")
+    for hash_, lot in (("h1", "A_1"), ("h2", "AB1"), ("h3", "A%"), ("h4", "lot-a")):
+        put_run(store, hash_, 15.0, lot, datetime(2026, 1, 10))
+
+    assert list(store.history(lot="A_")["lot"]) == ["A_1"]
+    assert list(store.history(lot="A%")["lot"]) == ["A%"]
+    assert sorted(store.history(lot="A")["lot"]) == ["A%", "AB1", "A_1"]
+    assert store.history(lot="\U0010ffff").empty
+
+
+def trace_values(values) -> np.ndarray:
+    # Figures loaded from JSON keep plotly's base64 typed arrays as {"dtype", "bdata"} dicts.
+    if isinstance(values, dict):
+        return np.frombuffer(base64.b64decode(values["bdata"]), dtype=values["dtype"])
+    return np.asarray(values, dtype=float)
+
+
+def test_stored_figure_keeps_lines_and_samples_points(tmp_path) -> None:
+    rng = np.random.default_rng(1)
+    x = rng.uniform(1.0, 5.0, 10_000)
+    csv_bytes = pd.DataFrame({"F.S.Flux": x, "Ele.Flow": 10.0 * x + rng.normal(0.0, 1.0, x.size)}).to_csv(index=False)
+    store = ResultStore(tmp_path / "results.sqlite3")
+    output = run_analysis_pipeline(csv_bytes.encode("utf-8"), "big.csv", 15.0, 45.0, store=store)
+    stored = store.get(make_cache_key(dataset_fingerprint(csv_bytes.encode("utf-8")), 15.0, 45.0, 95.0))
+
+    original = {trace.name: trace for trace in output.figure.data}
+    points = 0
+    for trace in stored.figure.data:
+        if trace.mode == "markers":
+            points += len(trace_values(trace.x))
+        else:
+            np.testing.assert_allclose(trace_values(trace.y), trace_values(original[trace.name].y))
+    assert points <= FIGURE_MAX_POINTS + 2
+    assert len(stored.figure.data) == len(output.figure.data)
+
+
+def test_pipeline_cache_hit_skips_the_fit(tmp_path, monkeypatch) -> None:
+    store = ResultStore(tmp_path / "results.sqlite3")
+    first = run_analysis_pipeline(CSV_BYTES, "data.csv", 15.0, 45.0, store=store, lot="LOT-1")
+    assert not first.cached
+
+    def fail(*args, **kwargs):
+        raise AssertionError("fit should not run on a cache hit")
+
+    monkeypatch.setattr(pipeline, "compute_fit_statistics", fail)
+    second = run_analysis_pipeline(CSV_BYTES, "data.csv", 15.0, 45.0, store=store)
+
+    assert second.cached
+    assert second.result == first.result
+    assert (second.in_count, second.out_count) == (first.in_count, first.out_count)
+    assert store.history()["dataset_hash"].tolist() == [dataset_fingerprint(CSV_BYTES)] * 2
+
+    with pytest.raises(AssertionError, match="cache hit"):
+        run_analysis_pipeline(CSV_BYTES, "data.csv", 15.0, 45.0, prediction_interval_pct=90.0, store=store)
+
+
+def test_cache_hit_records_history_for_new_lot(tmp_path) -> None:
+    store = ResultStore(tmp_path / "results.sqlite3")
+    run_analysis_pipeline(CSV_BYTES, "data.csv", 15.0, 45.0, store=store, lot="LOT-1")
+    second = run_analysis_pipeline(CSV_BYTES, "data.csv", 15.0, 45.0, store=store, lot="LOT-2")
+
+    assert second.cached
+    history = store.history()
+    assert sorted(history["lot"]) == ["LOT-1", "LOT-2"]
+    assert history.set_index("lot")["cached"].to_dict() == {"LOT-1": False, "LOT-2": True}
+    assert history["slope"].nunique() == 1
+    assert not store.record_run("unknown-key", lot="LOT-3")
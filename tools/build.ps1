@@ -55,6 +55,8 @@ Invoke-PythonChecked -Args @(
     "--collect-all", "streamlit",
     "--collect-all", "plotly",
     "--collect-all", "statsmodels",
+    "--collect-all", "scipy",
+    "--collect-all", "pyarrow",
     "--collect-all", "pandas",
     "--collect-all", "numpy",
     "run_streamlit_app.py"
@@ -0,0 +1,63 @@
+"""Load test for run_analysis_service.py: reports requests/sec and latency percentiles.
+
+Usage:
+    python run_analysis_service.py --quiet
+    python tools/load_test_service.py --requests 2000 --concurrency 16
+"""
+import argparse
+import json
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+
+def post(url: str, body: bytes, content_type: str) -> float:
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": content_type}, method="POST")
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8502")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--csv", default=str(Path(__file__).resolve().parent.parent / "sample_data.csv"))
+    parser.add_argument("--min-ele-flow", type=float, default=8800.0)
+    parser.add_argument("--max-ele-flow", type=float, default=13200.0)
+    args = parser.parse_args()
+
+    query = f"?min_ele_flow={args.min_ele_flow}&max_ele_flow={args.max_ele_flow}"
+    body = Path(args.csv).read_bytes()
+    url = f"{args.url}/analyze{query}"
+
+    # One request up front so connection errors surface before timing starts.
+    post(url, body, "text/csv")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = np.array(list(pool.map(lambda _: post(url, body, "text/csv"), range(args.requests))))
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "requests_per_sec": round(args.requests / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000.0, 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000.0, 2),
+        "max_ms": round(float(latencies.max()) * 1000.0, 2),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
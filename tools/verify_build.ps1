@@ -9,6 +9,8 @@ $requiredPaths = @(
     "dist\AppStart\AppStart.exe",
     "dist\AppStart\_internal\app.py",
     "dist\AppStart\_internal\src\analysis.py",
+    "dist\AppStart\_internal\scipy\special",
+    "dist\AppStart\_internal\pyarrow",
     "dist\AppStart\_internal\sample_data.csv"
 )
 